@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+Eşzamanlılık benchmark'ı - bloklayan vs asenkron veritabanı erişimi
+
+Aynı iki endpoint'i (barkod sorgusu + FTS5 ürün araması) iki farklı şekilde
+yazan iki küçük uygulamayı ASGI transport üzerinden (ağ olmadan) yükler:
+
+- blocking: async handler içinde senkron `db.*` çağrısı (eski durum)
+- async:    `await async_db.*` ile executor üzerinde çalışan sorgu
+
+Yük sürerken veritabanına dokunmayan bir `/ping` endpoint'i düzenli olarak
+yoklanır; ping gecikmesi event loop'un ne kadar süre bloklandığını gösterir
+(bloklayan modda istek başı gecikme kuyrukta bekleme süresini içermez).
+Paralel kazanç çekirdek sayısına bağlıdır: SQLite sorgu sırasında GIL'i
+bıraktığı için çok çekirdekli makinelerde async modun throughput'u artar.
+
+Kullanım:
+    python benchmarks/bench_async_db.py --products 200000 --concurrency 128
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _seed_database(path: str, product_count: int):
+    """Benchmark için geçici veritabanını ürünlerle doldur"""
+    import sqlite3
+    from db.init_db import init_database
+
+    init_database()
+    conn = sqlite3.connect(path)
+    rows = (
+        (f"869{i:010d}", f"Ürün {i} ekmek", f"Marka {i % 500}", "safe", False, "benchmark")
+        for i in range(product_count)
+    )
+    conn.executemany("""
+    INSERT OR IGNORE INTO products
+    (barcode, product_name, brand, risk_level, contains_gluten, source)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+
+def _build_apps():
+    from fastapi import FastAPI
+    from db.database import db
+    from db.async_database import async_db
+
+    blocking = FastAPI()
+
+    @blocking.get("/ping")
+    async def blocking_ping():
+        return {"ok": True}
+
+    @blocking.get("/scan/{barcode}")
+    async def blocking_scan(barcode: str):
+        return {"found": db.get_product_by_barcode(barcode) is not None}
+
+    @blocking.get("/search")
+    async def blocking_search(q: str):
+        return {"total": len(db.search_products(q, 10))}
+
+    non_blocking = FastAPI()
+
+    @non_blocking.get("/ping")
+    async def async_ping():
+        return {"ok": True}
+
+    @non_blocking.get("/scan/{barcode}")
+    async def async_scan(barcode: str):
+        return {"found": await async_db.get_product_by_barcode(barcode) is not None}
+
+    @non_blocking.get("/search")
+    async def async_search(q: str):
+        return {"total": len(await async_db.search_products(q, 10))}
+
+    return {"blocking": blocking, "async": non_blocking}
+
+
+async def _run_scenario(app, args, product_count: int):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    scan_latencies = []
+    search_latencies = []
+    ping_latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    rng = random.Random(42)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            async with semaphore:
+                # Her N istekten biri daha ağır bir FTS5 araması: "marka" öneki tüm
+                # ürünlerle eşleşir, sonuç boş olsa da uzun eşleşme listesi taranır
+                if i % args.search_every == 0:
+                    url, bucket = f"/search?q=marka {rng.randint(0, 499)}x", search_latencies
+                else:
+                    url, bucket = f"/scan/869{rng.randint(0, product_count * 2):010d}", scan_latencies
+                started = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                bucket.append((time.perf_counter() - started) * 1000)
+
+        done = asyncio.Event()
+
+        async def probe():
+            # Event loop duyarlılığı: DB'ye dokunmayan istek ne kadar bekliyor?
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/ping")
+                ping_latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.005)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "throughput_rps": args.requests / elapsed,
+        "scan_p50_ms": statistics.median(scan_latencies) if scan_latencies else 0.0,
+        "scan_p99_ms": _percentile(scan_latencies, 99),
+        "search_p50_ms": statistics.median(search_latencies) if search_latencies else 0.0,
+        "ping_p50_ms": statistics.median(ping_latencies) if ping_latencies else 0.0,
+        "ping_p99_ms": _percentile(ping_latencies, 99),
+        "ping_count": len(ping_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bloklayan vs asenkron DB erişimi benchmark'ı")
+    parser.add_argument("--products", type=int, default=200_000, help="Örnek ürün sayısı")
+    parser.add_argument("--requests", type=int, default=2_000, help="Toplam istek sayısı")
+    parser.add_argument("--concurrency", type=int, default=128, help="Eşzamanlı istek sayısı")
+    parser.add_argument("--search-every", type=int, default=20, help="Her N istekte bir arama")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_async_db_")
+    db_path = os.path.join(workdir, "bench.db")
+    # config import edilmeden önce ayarlanmalı
+    os.environ["DATABASE_PATH"] = db_path
+
+    print(f"📦 {args.products} ürünlük veritabanı hazırlanıyor: {db_path}")
+    _seed_database(db_path, args.products)
+
+    apps = _build_apps()
+    print(f"🚀 {args.requests} istek, {args.concurrency} eşzamanlı")
+    print(f"🖥️  CPU çekirdeği: {os.cpu_count()}")
+    print(
+        f"{'mod':<10} {'istek/sn':>10} {'scan p50':>10} {'scan p99':>10} "
+        f"{'arama p50':>10} {'ping p50':>10} {'ping p99':>10} {'ping adet':>10}"
+    )
+    for name, app in apps.items():
+        result = asyncio.run(_run_scenario(app, args, args.products))
+        print(
+            f"{name:<10} {result['throughput_rps']:>10.1f} "
+            f"{result['scan_p50_ms']:>8.2f}ms {result['scan_p99_ms']:>8.2f}ms "
+            f"{result['search_p50_ms']:>8.2f}ms {result['ping_p50_ms']:>8.2f}ms "
+            f"{result['ping_p99_ms']:>8.2f}ms {result['ping_count']:>10}"
+        )
+
+    from db.async_database import async_db
+    async_db.shutdown()
+
+
+if __name__ == "__main__":
+    main()
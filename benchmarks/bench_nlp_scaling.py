@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+"""
+NLP analyzer ölçeklenme benchmark'ı - malzeme listesi ve anahtar kelime sayısına göre
+
+İki analyzer karşılaştırılır:
+
+- full:   `services/nlp_analyzer.NLPAnalyzer` (Aho-Corasick kural seti;
+          zero-shot model yüklenmez, yalnızca kural motoru ölçülür)
+- simple: `services/nlp_analyzer_simple.NLPAnalyzer` (anahtar kelime başına regex)
+
+Sentetik Türkçe malzeme listeleri (varsayılan 10-500 malzeme) ve anahtar
+kelime setleri (15-10.000 terim) üretilir; her kombinasyon için
+`analyze_ingredients`, `analyze_text` ve `calculate_risk_score` çağrı
+başına süresi ölçülür (timeit autorange, `--repeat` ölçümün en iyisi).
+Full analyzer için kural setinin derlenme süresi `build` satırında verilir.
+
+Sonuçta her analyzer/işlem için log-log eğim (ölçeklenme üssü) raporlanır:
+~1 doğrusal, ~2 karesel büyüme demektir. `--max-exponent` verilirse bir
+eğim bu değeri aştığında çıkış kodu 1 olur. `--csv` grafik çizimine hazır
+uzun biçimli (tidy) tablo yazar.
+
+Kullanım:
+    python benchmarks/bench_nlp_scaling.py --csv nlp_scaling.csv
+    python benchmarks/bench_nlp_scaling.py --items 10 100 --keywords 15 1000 --max-exponent 1.5
+"""
+import argparse
+import csv
+import math
+import random
+import sys
+import time
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Sentetik kelimeler için Türkçe heceler
+SYLLABLES = [
+    "ak", "al", "an", "ar", "ba", "be", "bu", "ça", "çe", "da", "de", "do", "ğa", "ka",
+    "ke", "ku", "la", "le", "lı", "ma", "me", "mı", "na", "ne", "nı", "ö", "pa", "ra",
+    "re", "sa", "se", "şa", "şe", "ta", "te", "tı", "tu", "ü", "ya", "ye", "za", "ze",
+]
+
+# Listelerde en sık görülen, kural setine takılmayan malzemeler
+COMMON_INGREDIENTS = [
+    "şeker", "su", "tuz", "ayçiçek yağı", "mısır nişastası", "pirinç", "süt tozu",
+    "peynir altı suyu tozu", "kakao", "vanilin", "soya lesitini", "glikoz şurubu",
+    "sodyum bikarbonat", "sitrik asit", "domates", "sarımsak", "karabiber", "yumurta",
+    "fındık", "çilek", "limon suyu", "zeytinyağı", "patates", "nohut", "mercimek",
+]
+
+
+def _synthetic_words(count: int, rng: random.Random, exclude: set):
+    """Benzersiz, yalnızca harflerden oluşan sentetik terimler (regex güvenli)"""
+    words = []
+    seen = set(exclude)
+    while len(words) < count:
+        parts = rng.randint(2, 4)
+        word = "".join(rng.choice(SYLLABLES) for _ in range(parts))
+        if rng.random() < 0.3:
+            word += " " + "".join(rng.choice(SYLLABLES) for _ in range(2))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def build_keywords(total: int, base_dangerous: list, base_risky: list, rng: random.Random):
+    """(tehlikeli, riskli) listeleri: önce gerçek anahtar kelimeler, sonra sentetikler (2:1)"""
+    dangerous_count = max(1, round(total * 2 / 3))
+    risky_count = max(1, total - dangerous_count)
+    dangerous = base_dangerous[:dangerous_count]
+    risky = base_risky[:risky_count]
+    extra = _synthetic_words(
+        dangerous_count - len(dangerous) + risky_count - len(risky),
+        rng, set(base_dangerous) | set(base_risky) | set(COMMON_INGREDIENTS)
+    )
+    split = dangerous_count - len(dangerous)
+    return dangerous + extra[:split], risky + extra[split:]
+
+
+def build_ingredients(count: int, dangerous: list, risky: list, rng: random.Random):
+    """Çoğu zararsız, yaklaşık %5'i kural setine takılan malzeme listesi"""
+    filler = _synthetic_words(max(10, count // 4), rng, set(dangerous) | set(risky))
+    items = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.03:
+            items.append(f"{rng.choice(dangerous)} özü")
+        elif roll < 0.05:
+            items.append(f"{rng.choice(risky)} eser miktarda")
+        elif roll < 0.75:
+            items.append(rng.choice(COMMON_INGREDIENTS))
+        else:
+            items.append(rng.choice(filler))
+    return items
+
+
+def _time_call(func, repeat: int) -> float:
+    """Çağrı başına en iyi süre (µs)"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def _make_analyzers(dangerous: list, risky: list):
+    """{ad: (analyzer, işlem -> çağrı üreticisi)}"""
+    from services.nlp_analyzer import NLPAnalyzer
+    from services.nlp_analyzer_simple import NLPAnalyzer as SimpleAnalyzer
+    from services.ruleset import Ruleset, StaticRulesets
+
+    started = time.perf_counter()
+    ruleset = Ruleset(1, dangerous, risky)
+    build_us = (time.perf_counter() - started) * 1e6
+
+    # Yalnızca kural motoru: zero-shot modeli yüklenmez
+    full = NLPAnalyzer(rulesets=StaticRulesets(ruleset), database=None, load_model=False)
+
+    simple = SimpleAnalyzer()
+    simple.dangerous_keywords = dangerous
+    simple.risky_keywords = risky
+
+    def full_calls(items, text):
+        result = full.analyze_ingredients(items)
+        return {
+            "analyze_ingredients": lambda: full.analyze_ingredients(items),
+            "analyze_text": lambda: full.analyze_text(text),
+            "calculate_risk_score": lambda: full.calculate_risk_score(result),
+        }
+
+    def simple_calls(items, text):
+        joined = ", ".join(items)
+        return {
+            "analyze_ingredients": lambda: simple.analyze_ingredients(joined),
+            "analyze_text": lambda: simple.analyze_text(text),
+            "calculate_risk_score": lambda: simple.calculate_risk_score(items),
+        }
+
+    return {"full": full_calls, "simple": simple_calls}, build_us
+
+
+def _slope(points):
+    """log-log en küçük kareler eğimi; en az iki farklı x gerekir"""
+    points = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y > 0]
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    return numerator / denominator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NLP analyzer ölçeklenme benchmark'ı")
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 50, 100, 500],
+                        help="Malzeme listesi uzunlukları")
+    parser.add_argument("--keywords", type=int, nargs="+", default=[15, 100, 1000, 10000],
+                        help="Anahtar kelime seti boyutları")
+    parser.add_argument("--analyzers", nargs="+", default=["full", "simple"], choices=["full", "simple"])
+    parser.add_argument("--repeat", type=int, default=3, help="Ölçüm tekrarı (en iyisi alınır)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--csv", type=Path, help="Sonuçları CSV olarak yaz")
+    parser.add_argument("--max-exponent", type=float, help="İzin verilen en yüksek ölçeklenme üssü")
+    args = parser.parse_args()
+
+    # Analyzer oluşturma logları tabloyu bozmasın
+    from utils.logger import logger
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    from services.nlp_analyzer_simple import NLPAnalyzer as SimpleAnalyzer
+    defaults = SimpleAnalyzer()
+    base_dangerous, base_risky = defaults.dangerous_keywords, defaults.risky_keywords
+
+    rows = []
+    print(f"{'analyzer':<8} {'işlem':<22} {'malzeme':>8} {'kelime':>8} {'çağrı başı':>14}")
+    for keyword_count in args.keywords:
+        rng = random.Random(args.seed)
+        dangerous, risky = build_keywords(keyword_count, base_dangerous, base_risky, rng)
+        calls_for, build_us = _make_analyzers(dangerous, risky)
+
+        if "full" in args.analyzers:
+            rows.append({"analyzer": "full", "operation": "build", "items": 0,
+                         "keywords": keyword_count, "text_chars": 0, "per_call_us": round(build_us, 2)})
+            print(f"{'full':<8} {'build':<22} {'-':>8} {keyword_count:>8} {build_us / 1000:>12.3f}ms")
+
+        for item_count in args.items:
+            items = build_ingredients(item_count, dangerous, risky, random.Random(args.seed + item_count))
+            text = "İçindekiler: " + ", ".join(items) + "."
+            for analyzer in args.analyzers:
+                for operation, call in calls_for[analyzer](items, text).items():
+                    per_call_us = _time_call(call, args.repeat)
+                    rows.append({
+                        "analyzer": analyzer, "operation": operation, "items": item_count,
+                        "keywords": keyword_count, "text_chars": len(text),
+                        "per_call_us": round(per_call_us, 2),
+                    })
+                    print(
+                        f"{analyzer:<8} {operation:<22} {item_count:>8} {keyword_count:>8} "
+                        f"{per_call_us / 1000:>12.3f}ms"
+                    )
+
+    # Ölçeklenme üsleri: diğer eksen en büyük değerinde sabitken
+    print(f"\n{'analyzer':<8} {'işlem':<22} {'malzeme üssü':>14} {'kelime üssü':>14}")
+    violations = []
+    max_items, max_keywords = max(args.items), max(args.keywords)
+    for analyzer in args.analyzers:
+        for operation in ("analyze_ingredients", "analyze_text", "calculate_risk_score", "build"):
+            subset = [r for r in rows if r["analyzer"] == analyzer and r["operation"] == operation]
+            if not subset:
+                continue
+            by_items = _slope([(r["items"], r["per_call_us"]) for r in subset if r["keywords"] == max_keywords])
+            by_keywords = _slope([
+                (r["keywords"], r["per_call_us"]) for r in subset
+                if r["items"] == (0 if operation == "build" else max_items)
+            ])
+            format_slope = lambda s: f"{s:>14.2f}" if s is not None else f"{'-':>14}"
+            print(f"{analyzer:<8} {operation:<22} {format_slope(by_items)} {format_slope(by_keywords)}")
+            for axis, value in (("malzeme", by_items), ("kelime", by_keywords)):
+                if args.max_exponent is not None and value is not None and value > args.max_exponent:
+                    violations.append(f"{analyzer}.{operation} ({axis}): {value:.2f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\n💾 CSV yazıldı: {args.csv}")
+
+    if violations:
+        print(f"\n❌ Ölçeklenme üssü {args.max_exponent} sınırını aştı:")
+        for violation in violations:
+            print(f"   {violation}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
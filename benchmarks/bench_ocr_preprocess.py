@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+OCR ön işleme benchmark'ı - preset başına gecikme ve tanıma doğruluğu
+
+Örnek klasöründeki her görüntü (`.jpg`/`.png`) için aynı adlı `.txt`
+dosyası beklenen metni içerir. Her preset için ön işleme süresi, toplam
+OCR süresi ve karakter düzeyinde benzerlik (difflib oranı, Türkçe
+katlanmış ve boşlukları sadeleştirilmiş metin üzerinde) raporlanır.
+
+Klasör verilmezse telefon fotoğrafı boyutunda (4032x3024) sentetik
+etiketler üretilir; bunların bir kısmı EXIF ile döndürülmüştür. Gerçek
+etiket fotoğraflarıyla ölçmek için kendi klasörünüzü verin.
+
+EasyOCR kurulu değilse yalnızca ön işleme süreleri ölçülür.
+
+Kullanım:
+    python benchmarks/bench_ocr_preprocess.py --samples ./samples --repeat 3
+"""
+import argparse
+import difflib
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.helpers import fold_turkish
+from utils.image_preprocessing import PRESETS, preprocess_image, resolve_preset
+
+
+SAMPLE_TEXTS = [
+    "İçindekiler: Buğday unu, şeker, bitkisel yağ, tuz, maya",
+    "Bileşenleri: Mısır nişastası, pirinç unu, su, tuz",
+    "Ingredients: oat flakes, barley malt extract, sugar, salt",
+    "İçindekiler: Süt, çilek, şeker. Eser miktarda gluten içerebilir",
+]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(fold_turkish(text).split())
+
+
+def _similarity(expected: str, actual: str) -> float:
+    return difflib.SequenceMatcher(None, _normalize(expected), _normalize(actual)).ratio()
+
+
+def _generate_samples(directory: Path):
+    """Sentetik etiket fotoğrafları üret (büyük, hafif gürültülü, bir kısmı döndürülmüş)"""
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+    try:
+        font = ImageFont.load_default(size=120)
+    except TypeError:
+        font = ImageFont.load_default()
+
+    for index, text in enumerate(SAMPLE_TEXTS):
+        image = Image.new("RGB", (4032, 3024), (236, 230, 214))
+        draw = ImageDraw.Draw(image)
+        y = 400
+        line = ""
+        for word in text.split():
+            candidate = f"{line} {word}".strip()
+            if draw.textlength(candidate, font=font) > 3600:
+                draw.text((200, y), line, fill=(40, 40, 40), font=font)
+                y += 180
+                line = word
+            else:
+                line = candidate
+        draw.text((200, y), line, fill=(40, 40, 40), font=font)
+        image = image.filter(ImageFilter.GaussianBlur(1.5))
+
+        exif = Image.Exif()
+        if index % 2:
+            # Telefon dik tutulmuş: pikseller yatık, EXIF 6 = 90° saat yönünde döndür
+            image = image.rotate(90, expand=True)
+            exif[0x0112] = 6
+
+        image.save(directory / f"sample_{index}.jpg", "JPEG", quality=90, exif=exif)
+        (directory / f"sample_{index}.txt").write_text(text, encoding="utf-8")
+
+
+def _load_samples(directory: Path):
+    samples = []
+    for path in sorted(directory.iterdir()):
+        if path.suffix.lower() not in (".jpg", ".jpeg", ".png"):
+            continue
+        truth = path.with_suffix(".txt")
+        expected = truth.read_text(encoding="utf-8") if truth.exists() else None
+        samples.append((path.name, path.read_bytes(), expected))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR ön işleme preset karşılaştırması")
+    parser.add_argument("--samples", type=Path, help="Görüntü + .txt klasörü (varsayılan: sentetik)")
+    parser.add_argument("--presets", nargs="+", default=list(PRESETS), help="Denenecek preset'ler")
+    parser.add_argument("--repeat", type=int, default=1, help="Görüntü başına tekrar sayısı")
+    args = parser.parse_args()
+
+    directory = args.samples
+    if directory is None:
+        directory = Path(tempfile.mkdtemp(prefix="bench_ocr_"))
+        print(f"🖼️  Sentetik örnekler üretiliyor: {directory}")
+        _generate_samples(directory)
+
+    samples = _load_samples(directory)
+    if not samples:
+        print(f"❌ {directory} içinde görüntü bulunamadı")
+        sys.exit(1)
+
+    try:
+        import easyocr
+        reader = easyocr.Reader(["tr", "en"], gpu=False)
+    except ImportError:
+        reader = None
+        print("⚠️  EasyOCR kurulu değil, yalnızca ön işleme süreleri ölçülecek")
+
+    print(f"📦 {len(samples)} örnek, {args.repeat} tekrar")
+    print(f"{'preset':<10} {'boyut':>11} {'hazırlık':>10} {'toplam p50':>11} {'toplam max':>11} {'doğruluk':>9}")
+
+    for name in args.presets:
+        options = resolve_preset(name)
+        prepare_times, total_times, scores = [], [], []
+        shape = None
+
+        for _, data, expected in samples:
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                image = preprocess_image(data, options)
+                prepared = time.perf_counter()
+                shape = image.shape
+                text = ""
+                if reader is not None:
+                    text = "\n".join(reader.readtext(image, detail=0))
+                finished = time.perf_counter()
+
+                prepare_times.append((prepared - started) * 1000)
+                total_times.append((finished - started) * 1000)
+            if reader is not None and expected is not None:
+                scores.append(_similarity(expected, text))
+
+        size = f"{shape[1]}x{shape[0]}"
+        accuracy = f"{statistics.mean(scores) * 100:>8.1f}%" if scores else f"{'-':>9}"
+        print(
+            f"{name:<10} {size:>11} {statistics.median(prepare_times):>8.1f}ms "
+            f"{statistics.median(total_times):>9.1f}ms {max(total_times):>9.1f}ms {accuracy}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Başlangıç benchmark'ı - modül başına import süresi ve `app` sonrası RSS
+
+Her ölçüm temiz bir alt süreçte `python -X importtime` ile `import main`
+çalıştırır (FastAPI uygulaması modül yüklenirken oluşturulur, lifespan
+çalışmaz). Raporlanan:
+
+- toplam import süresi ve `app` oluştuktan sonraki RSS (ölçümlerin medyanı)
+- ağır opsiyonel bağımlılıkların (torch, transformers, easyocr, numpy, PIL)
+  import edilip edilmediği
+- en pahalı uygulama modülleri ve üst düzey paketler (kümülatif süre)
+
+`--budget` verilirse medyan import süresi bütçeyi aştığında çıkış kodu 1
+olur; CI'da soğuk başlangıç gerilemelerini yakalamak için kullanılabilir.
+
+Kullanım:
+    python benchmarks/bench_startup.py --runs 5 --top 15 --budget 1.0
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ["torch", "transformers", "easyocr", "numpy", "PIL", "cv2"]
+
+APP_PREFIXES = ("main", "config", "models", "db", "services", "routes", "utils")
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+rss_kb = 0
+try:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+except OSError:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "import_s": elapsed,
+    "rss_mb": rss_kb / 1024,
+    "heavy": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def _parse_importtime(stderr: str):
+    """`-X importtime` çıktısı: [(modül, kendi µs, kümülatif µs)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _run_once():
+    # import sırasında veritabanı bağlantısı açılmaz, lifespan çalışmaz
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit("❌ import main başarısız")
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    return summary, _parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soğuk başlangıç (import + RSS) benchmark'ı")
+    parser.add_argument("--runs", type=int, default=3, help="Ölçüm sayısı (medyan raporlanır)")
+    parser.add_argument("--top", type=int, default=10, help="Listelenecek modül sayısı")
+    parser.add_argument("--budget", type=float, help="İzin verilen import süresi (saniye)")
+    args = parser.parse_args()
+
+    summaries, timings = [], None
+    for _ in range(args.runs):
+        summary, rows = _run_once()
+        summaries.append(summary)
+        timings = rows
+
+    import_s = statistics.median(s["import_s"] for s in summaries)
+    rss_mb = statistics.median(s["rss_mb"] for s in summaries)
+    heavy = summaries[-1]["heavy"]
+
+    print(f"🚀 import main: {import_s * 1000:.0f} ms (medyan, {args.runs} ölçüm)")
+    print(f"🧠 RSS (app oluşturulduktan sonra): {rss_mb:.1f} MB")
+    print(f"📦 Ağır bağımlılıklar: {', '.join(heavy) if heavy else 'hiçbiri import edilmedi'}")
+
+    app_rows = [r for r in timings if r[0].split(".")[0] in APP_PREFIXES]
+    # Üst düzey paketler hangi derinlikte import edildiyse oradan sayılır (ör. main -> fastapi)
+    package_rows = [r for r in timings if "." not in r[0] and r[0] not in APP_PREFIXES]
+
+    for title, rows in (("Uygulama modülleri", app_rows), ("Üst düzey paketler", package_rows)):
+        print(f"\n{title} (kümülatif):")
+        print(f"{'modül':<40} {'kümülatif':>10} {'kendi':>10}")
+        for name, self_us, cumulative_us in sorted(rows, key=lambda r: -r[2])[:args.top]:
+            print(f"{name:<40} {cumulative_us / 1000:>8.1f}ms {self_us / 1000:>8.1f}ms")
+
+    if args.budget is not None and import_s > args.budget:
+        print(f"\n❌ Import süresi bütçeyi aştı: {import_s:.2f}s > {args.budget:.2f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+"""
+Yük testi ve gecikme gerilemesi benchmark'ı - gerçek `main.app` üzerinde
+
+Uygulama ASGI transport üzerinden (ağ olmadan) ve lifespan ile birlikte
+çalıştırılır; middleware'ler, önbellekler, Bloom filtresi ve kural seti
+üretimdekiyle aynıdır. Geçici bir veritabanı örnek ürünlerle doldurulur.
+
+Senaryolar (her biri ayrı ölçülür):
+
+- scan_hit:  var olan barkod (`POST /api/v1/scan/barcode`)
+- scan_miss: olmayan barkod (Bloom filtresi kısa devresi)
+- search:    ürün araması (`GET /api/v1/products/search`)
+- text:      metin analizi (`POST /api/v1/analyze/text`)
+- ocr:       etiket fotoğrafı analizi; EasyOCR yerine `--ocr-ms` uyuyan
+             sahte bir okuyucu kullanılır (görüntü çözme ve ön işleme gerçek).
+             Eşzamanlılık OCR kuyruk kapasitesiyle sınırlanır
+- mix:       yukarıdakilerin ağırlıklı karışımı (kuyruk dolunca 503'ler
+             `rejected` olarak ayrıca sayılır)
+
+Sonuçlar (istek/sn, p50/p95/p99) JSON'a yazılır. `--baseline` verilirse
+her senaryo baz çizgiyle karşılaştırılır; p95 gecikme `--threshold`
+oranından fazla artarsa ya da throughput o oranda düşerse çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/load_test.py --save-baseline benchmarks/results/baseline.json
+    python benchmarks/load_test.py --baseline benchmarks/results/baseline.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SCENARIOS = ["scan_hit", "scan_miss", "search", "text", "ocr", "mix"]
+
+# mix senaryosunda her isteğin türü bu ağırlıklarla seçilir
+MIX_WEIGHTS = {"scan_hit": 50, "scan_miss": 20, "search": 15, "text": 10, "ocr": 5}
+
+SEARCH_TERMS = ["ekmek", "marka 12", "ürün 4", "bisküvi", "glutensiz", "makarna"]
+
+TEXT_SAMPLES = [
+    "İçindekiler: buğday unu, şeker, bitkisel yağ, tuz, maya",
+    "Pirinç unu, mısır nişastası, şeker, eser miktarda gluten içerebilir",
+    "Su, domates, tuz, baharat",
+    "Ingredients: wheat flour, barley malt extract, sugar, salt",
+    "Karabuğday, kinoa, keten tohumu, yulaf (glutensiz sertifikalı)",
+]
+
+OCR_TEXT = "İçindekiler: buğday unu, su, tuz, şeker, maya, eser miktarda susam içerebilir"
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _configure_environment(args, workdir: str):
+    """config import edilmeden önce çağrılmalı"""
+    os.environ["DATABASE_PATH"] = os.path.join(workdir, "load_test.db")
+    os.environ["IMAGE_CACHE_PATH"] = os.path.join(workdir, "image_cache.db")
+    os.environ["IMAGE_CACHE_ENABLED"] = "true" if args.image_cache else "false"
+    # Sahte OCR süreç içinde çalışır; modeller yüklenmez
+    os.environ["OCR_POOL_ENABLED"] = "false"
+    os.environ["WARMUP_NLP"] = "false"
+    os.environ["WARMUP_OCR"] = "false"
+
+
+def _seed_database(product_count: int):
+    """Geçici veritabanını örnek ürünlerle doldur"""
+    import sqlite3
+    from config import settings
+    from db.init_db import init_database
+
+    init_database()
+    conn = sqlite3.connect(settings.database_path)
+    risk_levels = ["safe", "risky", "dangerous"]
+    rows = (
+        (f"869{i:010d}", f"Ürün {i} ekmek", f"Marka {i % 500}", risk_levels[i % 3],
+         i % 3 == 2, "benchmark")
+        for i in range(product_count)
+    )
+    conn.executemany("""
+    INSERT OR IGNORE INTO products
+    (barcode, product_name, brand, risk_level, contains_gluten, source)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+
+def _install_fake_ocr(ocr_ms: float):
+    """OCR havuzunun süreç içi motoruna sahte bir EasyOCR okuyucusu tak"""
+    import services.ocr_pool as ocr_pool_module
+    from services.ocr_engine import OCREngine
+
+    class FakeReader:
+        def readtext(self, image, detail=1):
+            # Gerçek okuyucu gibi thread'i bloklar (GIL dışında çalışan C kodu)
+            time.sleep(ocr_ms / 1000)
+            box = [[0, 0], [400, 0], [400, 30], [0, 30]]
+            return [(box, OCR_TEXT, 0.93)] if detail else [OCR_TEXT]
+
+    engine = OCREngine()
+    engine.reader = FakeReader()
+    ocr_pool_module.get_ocr_engine = lambda: engine
+
+
+def _sample_images(count: int):
+    """Birbirinden farklı küçük etiket fotoğrafları (görüntü önbelleği açıksa hepsi ayrı anahtar)"""
+    from PIL import Image, ImageDraw
+
+    images = []
+    for i in range(count):
+        image = Image.new("RGB", (800, 600), "white")
+        draw = ImageDraw.Draw(image)
+        draw.text((20, 20 + i % 40), f"{OCR_TEXT} #{i}", fill="black")
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+
+def _build_request(kind: str, rng: random.Random, product_count: int, images: list):
+    """(method, url, httpx kwargs)"""
+    if kind == "scan_hit":
+        barcode = f"869{rng.randrange(product_count):010d}"
+        return "POST", "/api/v1/scan/barcode", {"json": {"barcode": barcode}}
+    if kind == "scan_miss":
+        barcode = f"868{rng.randrange(10 ** 10):010d}"
+        return "POST", "/api/v1/scan/barcode", {"json": {"barcode": barcode}}
+    if kind == "search":
+        return "GET", "/api/v1/products/search", {"params": {"q": rng.choice(SEARCH_TERMS), "limit": 20}}
+    if kind == "text":
+        return "POST", "/api/v1/analyze/text", {"params": {"text": rng.choice(TEXT_SAMPLES)}}
+    if kind == "ocr":
+        files = {"image": ("label.jpg", rng.choice(images), "image/jpeg")}
+        return "POST", "/api/v1/analyze/ingredients", {"files": files}
+    raise ValueError(f"Bilinmeyen senaryo: {kind}")
+
+
+async def _run_scenario(client, name: str, args, images: list):
+    from services.ocr_pool import ocr_pool
+
+    rng = random.Random(42)
+    kinds, weights = list(MIX_WEIGHTS), list(MIX_WEIGHTS.values())
+    concurrency = args.concurrency
+    if name == "ocr":
+        # Kuyruk kapasitesinin üstü 503 ile reddedilir; saf OCR senaryosu gecikmeyi ölçsün
+        concurrency = min(concurrency, ocr_pool.capacity)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    rejected = 0
+
+    async def one(measure: bool):
+        nonlocal errors, rejected
+        kind = rng.choices(kinds, weights)[0] if name == "mix" else name
+        method, url, kwargs = _build_request(kind, rng, args.products, images)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            elapsed = (time.perf_counter() - started) * 1000
+        if not measure:
+            return
+        if response.status_code == 503:
+            # OCR kuyruğu dolu: aşırı yükte beklenen davranış, hata sayılmaz
+            rejected += 1
+        elif response.status_code >= 400:
+            errors += 1
+        else:
+            latencies.append(elapsed)
+
+    # Önbellekleri ve bağlantı havuzunu ısıt
+    await asyncio.gather(*(one(False) for _ in range(args.warmup)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(True) for _ in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": args.requests,
+        "ok": len(latencies),
+        "errors": errors,
+        "rejected": rejected,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+    }
+
+
+async def _run(args, scenarios: list):
+    import httpx
+    import main
+
+    images = _sample_images(args.images)
+    results = {}
+
+    # ASGITransport lifespan çalıştırmaz: başlangıç/kapanış burada yapılır
+    async with main.app.router.lifespan_context(main.app):
+        _install_fake_ocr(args.ocr_ms)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for name in scenarios:
+                result = await _run_scenario(client, name, args, images)
+                results[name] = result
+                print(
+                    f"{name:<10} {result['throughput_rps']:>10.1f} {result['p50_ms']:>8.2f}ms "
+                    f"{result['p95_ms']:>8.2f}ms {result['p99_ms']:>8.2f}ms "
+                    f"{result['errors']:>7} {result['rejected']:>8}"
+                )
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Baz çizgiye göre gerileyen senaryolar: [(senaryo, açıklama)]"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if previous["p95_ms"] > 0 and current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append((name, f"p95 {previous['p95_ms']:.2f}ms → {current['p95_ms']:.2f}ms"))
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - threshold):
+            regressions.append((
+                name, f"throughput {previous['throughput_rps']:.1f} → {current['throughput_rps']:.1f} istek/sn"
+            ))
+        if current["errors"] > previous["errors"]:
+            regressions.append((name, f"hata {previous['errors']} → {current['errors']}"))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Süreç içi HTTP yük testi ve gerileme kontrolü")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Virgülle ayrılmış senaryolar ({', '.join(SCENARIOS)})")
+    parser.add_argument("--requests", type=int, default=1_000, help="Senaryo başına ölçülen istek")
+    parser.add_argument("--warmup", type=int, default=50, help="Senaryo başına ısınma isteği")
+    parser.add_argument("--concurrency", type=int, default=32, help="Eşzamanlı istek sayısı")
+    parser.add_argument("--products", type=int, default=50_000, help="Örnek ürün sayısı")
+    parser.add_argument("--ocr-ms", type=float, default=50.0, help="Sahte OCR tanıma süresi (ms)")
+    parser.add_argument("--images", type=int, default=16, help="Farklı örnek fotoğraf sayısı")
+    parser.add_argument("--image-cache", action="store_true", help="Görüntü sonuç önbelleğini açık bırak")
+    parser.add_argument("--output", default=str(ROOT / "benchmarks" / "results" / "load_test.json"),
+                        help="Sonuç JSON dosyası")
+    parser.add_argument("--baseline", help="Karşılaştırılacak baz çizgi JSON dosyası")
+    parser.add_argument("--threshold", type=float, default=0.15, help="İzin verilen gerileme oranı")
+    parser.add_argument("--save-baseline", help="Sonuçları baz çizgi olarak da bu dosyaya yaz")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Bilinmeyen senaryo: {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    _configure_environment(args, workdir)
+
+    # İstek başına loglar (503 uyarıları dahil) ölçümü bozar: yalnızca hatalar konsola
+    from utils.logger import logger
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    print(f"📦 {args.products} ürünlük veritabanı hazırlanıyor: {workdir}")
+    _seed_database(args.products)
+
+    print(f"🚀 Senaryo başına {args.requests} istek, {args.concurrency} eşzamanlı, OCR {args.ocr_ms:.0f}ms")
+    print(f"{'senaryo':<10} {'istek/sn':>10} {'p50':>10} {'p95':>10} {'p99':>10} {'hata':>7} {'reddedilen':>8}")
+    results = asyncio.run(_run(args, scenarios))
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "products": args.products,
+            "ocr_ms": args.ocr_ms,
+            "image_cache": args.image_cache,
+        },
+        "scenarios": results,
+    }
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"💾 Sonuçlar yazıldı: {path}")
+
+    if not args.baseline:
+        return
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    if baseline.get("config") != report["config"]:
+        print("⚠️  Baz çizgi farklı ayarlarla ölçülmüş, karşılaştırma yanıltıcı olabilir")
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ %{args.threshold * 100:.0f} eşiğini aşan gerileme:")
+        for name, detail in regressions:
+            print(f"   {name}: {detail}")
+        sys.exit(1)
+    print(f"\n✅ Baz çizgiye göre gerileme yok (eşik %{args.threshold * 100:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,25 @@ class Settings(BaseSettings):
     
     # Database
     database_path: str = str(BASE_DIR / "db" / "gluten_db.db")
+    db_read_pool_size: int = 8
+    db_pool_timeout: float = 10.0
+    db_busy_timeout: int = 5000  # ms
+    db_journal_mode: str = "WAL"
+    db_synchronous: str = "NORMAL"
+    db_cache_size: int = -20000  # negatif değer KiB cinsinden (~20 MB)
+    db_mmap_size: int = 256 * 1024 * 1024
+    db_temp_store: str = "MEMORY"
+    
+    # Barkod önbelleği
+    barcode_cache_size: int = 10000
+    barcode_cache_ttl: float = 300.0  # saniye
+    barcode_cache_not_found_ttl: float = 60.0  # bulunamayan barkodlar için
+    barcode_bloom_enabled: bool = True
+    barcode_bloom_capacity: int = 1_000_000
+    barcode_bloom_error_rate: float = 0.001
+    barcode_bloom_refresh_interval: float = 300.0  # saniye, 0 = yenileme yok
+    barcode_bloom_version_check_interval: float = 1.0  # saniye, 0 = her sorguda
+    bulk_scan_max_barcodes: int = 500
     
     # External APIs
     openfoodfacts_api_url: str = "https://world.openfoodfacts.org/api/v0"
@@ -38,7 +57,46 @@ class Settings(BaseSettings):
     
     # OCR & NLP
     ocr_model: str = "tr"
+    ocr_pool_enabled: bool = True
+    ocr_workers: int = 2
+    ocr_queue_size: int = 8  # worker'lara ek olarak bekleyebilecek iş sayısı
+    ocr_retry_after: int = 5  # kuyruk doluyken Retry-After (saniye)
+    max_upload_size: int = 5 * 1024 * 1024  # bayt
+    ocr_preprocess_preset: str = "balanced"  # none, fast, balanced, quality
+    ocr_max_image_side: int = 0  # 0 = preset değeri
+    ocr_roi_enabled: bool = False  # yalnızca içindekiler bloğunu tanı
+    ocr_roi_max_gap: float = 2.5  # bloğu bitiren boşluk (satır yüksekliği katı)
     nlp_model: str = "distilbert-base-multilingual-cased"
+    ruleset_refresh_interval: float = 30.0  # saniye, 0 = yalnızca başlangıçta yükle
+    nlp_batch_size: int = 16
+    nlp_label_cache_size: int = 4096
+    
+    # Prometheus metrikleri (/metrics)
+    metrics_enabled: bool = True
+    
+    # İstek zamanlaması (Server-Timing başlığı)
+    server_timing_enabled: bool = True
+    server_timing_debug: bool = False  # analiz yanıtının debug bloğuna da ekle
+    
+    # Başlangıçta model ısıtma (/ready bunları bekler)
+    warmup_nlp: bool = True
+    warmup_ocr: bool = True
+    
+    # Asenkron analiz işleri
+    analysis_job_workers: int = 2
+    analysis_job_queue_size: int = 32
+    analysis_job_retention: float = 3600.0  # biten işlerin saklanma süresi (saniye)
+    analysis_job_max_wait: float = 30.0  # long-poll üst sınırı (saniye)
+    analysis_job_poll_interval: float = 0.5  # başka süreçteki işler için yoklama aralığı
+    analysis_job_drain_timeout: float = 30.0  # kapanışta kuyruğu bitirme süresi
+    analysis_job_timeout: float = 300.0  # OCR meşgulken tekrar denemelerin gönderimden itibaren üst sınırı
+    
+    # Görüntü sonuç önbelleği (OCR + analiz)
+    image_cache_enabled: bool = True
+    image_cache_path: str = str(BASE_DIR / "db" / "image_cache.db")
+    image_cache_max_bytes: int = 100 * 1024 * 1024
+    image_cache_perceptual: bool = False  # neredeyse aynı fotoğrafları da eşleştir
+    image_cache_phash_distance: int = 4  # algısal hash için en fazla farklı bit
     
     # Admin
     admin_username: str = "admin"
@@ -0,0 +1,120 @@
+"""
+Asenkron veritabanı erişimi - Database sorgularını event loop dışında çalıştırır
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Callable, Tuple
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import settings
+from db.database import Database, db
+
+
+class AsyncDatabase:
+    """Database'in awaitable karşılığı
+
+    Okumalar okuma havuzu kadar thread'li bir executor'da, yazmalar ise tek
+    thread'li ayrı bir executor'da çalışır; böylece bekleyen yazmalar okuma
+    thread'lerini işgal etmez ve uzun bir sorgu event loop'u durdurmaz.
+    """
+
+    def __init__(self, database: Database):
+        self._db = database
+        self._read_executor: Optional[ThreadPoolExecutor] = None
+        self._write_executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self, write: bool) -> ThreadPoolExecutor:
+        if write:
+            if self._write_executor is None:
+                self._write_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="db-write"
+                )
+            return self._write_executor
+
+        if self._read_executor is None:
+            self._read_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.db_read_pool_size),
+                thread_name_prefix="db-read"
+            )
+        return self._read_executor
+
+    async def _run(self, func: Callable, *args, write: bool = False):
+        loop = asyncio.get_running_loop()
+        # contextvars (ör. istek bazlı bağlam) executor thread'ine taşınır
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._get_executor(write),
+            functools.partial(ctx.run, func, *args)
+        )
+
+    def shutdown(self):
+        """Executor'ları kapat (bekleyen işler tamamlanır)"""
+        for executor in (self._read_executor, self._write_executor):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self._read_executor = None
+        self._write_executor = None
+
+    # ==================== ÜRÜN İŞLEMLERİ ====================
+
+    async def get_product_by_barcode(self, barcode: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self._db.get_product_by_barcode, barcode)
+
+    async def get_products_by_barcodes(self, barcodes: List[str]) -> Dict[str, Dict[str, Any]]:
+        return await self._run(self._db.get_products_by_barcodes, barcodes)
+
+    async def get_barcode_version(self) -> Tuple[int, int]:
+        return await self._run(self._db.get_barcode_version)
+
+    async def search_products(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return await self._run(self._db.search_products, query, limit)
+
+    async def create_product(self, product_data: Dict[str, Any]) -> int:
+        return await self._run(self._db.create_product, product_data, write=True)
+
+    async def update_product(self, product_id: int, product_data: Dict[str, Any]) -> bool:
+        return await self._run(self._db.update_product, product_id, product_data, write=True)
+
+    async def delete_product(self, product_id: int) -> bool:
+        return await self._run(self._db.delete_product, product_id, write=True)
+
+    # ==================== GLUTEN TEMİZLEYİCİLERİ ====================
+
+    async def get_flagged_ingredients(self) -> List[Dict[str, Any]]:
+        return await self._run(self._db.get_flagged_ingredients)
+
+    async def get_dangerous_ingredients(self) -> List[str]:
+        return await self._run(self._db.get_dangerous_ingredients)
+
+    async def get_risky_keywords(self) -> List[str]:
+        return await self._run(self._db.get_risky_keywords)
+
+    # ==================== ANALİZ İŞLERİ ====================
+
+    async def create_analysis_job(self, job_id: str):
+        return await self._run(self._db.create_analysis_job, job_id, write=True)
+
+    async def update_analysis_job(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None,
+                                  error_code: Optional[int] = None, error_detail: Optional[str] = None):
+        return await self._run(
+            self._db.update_analysis_job, job_id, status, result, error_code, error_detail, write=True
+        )
+
+    async def get_analysis_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self._db.get_analysis_job, job_id)
+
+    async def purge_analysis_jobs(self, older_than: float) -> int:
+        return await self._run(self._db.purge_analysis_jobs, older_than, write=True)
+
+    # ==================== İSTATİSTİKLER ====================
+
+    async def get_statistics(self) -> Dict[str, Any]:
+        return await self._run(self._db.get_statistics)
+
+
+# Global async database instance
+async_db = AsyncDatabase(db)
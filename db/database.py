@@ -1,41 +1,206 @@
 """
 Veritabanı bağlantı ve işlemleri
 """
+import json
+import os
+import queue
+import re
 import sqlite3
+import threading
+import time
 from pathlib import Path
 from contextlib import contextmanager
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import settings
+from utils.helpers import fold_turkish
+from utils.logger import logger
+from utils.metrics import track_db_query
+
+
+_FTS_TOKEN_RE = re.compile(r"\w+")
+
+# Eski SQLite sürümlerinde SQLITE_MAX_VARIABLE_NUMBER varsayılanı 999
+_MAX_QUERY_PARAMS = 900
+
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+def _pragma_choice(value: str, allowed: set, name: str) -> str:
+    """Ayarlardan gelen PRAGMA değerini doğrula"""
+    value = str(value).upper()
+    if value not in allowed:
+        raise ValueError(f"Geçersiz {name} değeri: {value} (izin verilenler: {sorted(allowed)})")
+    return value
+
+
+def _fts_match_expression(query: str) -> str:
+    """Arama metnini FTS5 önek sorgusuna çevir: 'Glutensiz ekm' -> "glutensiz"* "ekm"*"""
+    tokens = _FTS_TOKEN_RE.findall(fold_turkish(query))
+    return " ".join(f'"{token}"*' for token in tokens)
 
 
 class Database:
-    """SQLite Veritabanı Yöneticisi"""
+    """SQLite Veritabanı Yöneticisi
+
+    Bağlantılar uzun ömürlüdür: okumalar sınırlı bir havuzdan paylaşılır,
+    yazmalar ise tek bir bağlantı üzerinden kilitle sıraya sokulur (WAL
+    modunda okuyucular yazarı beklemez).
+    """
     
     def __init__(self):
         self.db_path = settings.database_path
+        self._journal_mode = _pragma_choice(settings.db_journal_mode, _JOURNAL_MODES, "journal_mode")
+        self._synchronous = _pragma_choice(settings.db_synchronous, _SYNCHRONOUS_MODES, "synchronous")
+        self._temp_store = _pragma_choice(settings.db_temp_store, _TEMP_STORES, "temp_store")
+        self._product_listeners: List[Callable[[str, str], None]] = []
+        self._reset_pool()
     
-    @contextmanager
-    def get_connection(self):
-        """Bağlantı context manager"""
-        conn = sqlite3.connect(self.db_path)
+    def _reset_pool(self):
+        """Havuz durumunu sıfırla (fork sonrası miras bağlantılar kullanılmaz)"""
+        self._pid = os.getpid()
+        self._pool_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # Yazma bağlantısının açılışı ayrı kilitte: okuma havuzu büyürken
+        # _write_lock alınmaz (get_connection içinden okuma yapılabilir)
+        self._writer_init_lock = threading.Lock()
+        self._read_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._read_count = 0
+        self._writer: Optional[sqlite3.Connection] = None
+    
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self._reset_pool()
+    
+    def _open_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Ayarlanmış PRAGMA'larla yeni bir bağlantı aç"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=settings.db_busy_timeout / 1000,
+            check_same_thread=False
+        )
         conn.row_factory = sqlite3.Row
+        if not read_only:
+            conn.execute(f"PRAGMA journal_mode = {self._journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self._synchronous}")
+        conn.execute(f"PRAGMA cache_size = {int(settings.db_cache_size)}")
+        conn.execute(f"PRAGMA mmap_size = {int(settings.db_mmap_size)}")
+        conn.execute(f"PRAGMA temp_store = {self._temp_store}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+    
+    def _get_writer(self) -> sqlite3.Connection:
+        with self._writer_init_lock:
+            if self._writer is None:
+                self._writer = self._open_connection(read_only=False)
+            return self._writer
+    
+    def _acquire_reader(self) -> sqlite3.Connection:
+        """Havuzdan okuma bağlantısı al, gerekirse yenisini aç"""
+        self._check_pid()
         try:
-            yield conn
-            conn.commit()
-        except Exception as e:
+            return self._read_pool.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._pool_lock:
+            can_open = self._read_count < settings.db_read_pool_size
+            if can_open:
+                self._read_count += 1
+        
+        if can_open:
+            try:
+                # İlk bağlantıda journal_mode'un (WAL) ayarlanmış olmasını garanti et
+                self._get_writer()
+                return self._open_connection(read_only=True)
+            except Exception:
+                with self._pool_lock:
+                    self._read_count -= 1
+                raise
+        
+        try:
+            return self._read_pool.get(timeout=settings.db_pool_timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Veritabanı bağlantı havuzu dolu (zaman aşımı)")
+    
+    def _release_reader(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
             conn.rollback()
-            raise e
+        self._read_pool.put(conn)
+    
+    @contextmanager
+    def get_read_connection(self):
+        """Okuma bağlantısı context manager (havuzdan)"""
+        conn = self._acquire_reader()
+        try:
+            yield conn
         finally:
-            conn.close()
+            self._release_reader(conn)
+    
+    @contextmanager
+    def get_connection(self):
+        """Yazma bağlantısı context manager (tek yazar, seri)"""
+        self._check_pid()
+        with self._write_lock:
+            conn = self._get_writer()
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
+    
+    def close(self):
+        """Havuzdaki tüm bağlantıları kapat"""
+        with self._write_lock, self._writer_init_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._pool_lock:
+            self._read_count = 0
+    
+    # ==================== DEĞİŞİKLİK BİLDİRİMLERİ ====================
+    
+    def add_product_listener(self, callback: Callable[[str, str], None]):
+        """
+        Ürün değişikliklerini dinle (önbellek invalidation vb.)
+        
+        callback(event, barcode) commit sonrasında çağrılır;
+        event: "insert", "update" veya "delete"
+        """
+        self._product_listeners.append(callback)
+    
+    def _notify_product_change(self, event: str, barcodes: List[str]):
+        for barcode in barcodes:
+            if not barcode:
+                continue
+            for callback in self._product_listeners:
+                try:
+                    callback(event, barcode)
+                except Exception as e:
+                    logger.warning(f"⚠️  Ürün dinleyicisi hatası ({event} {barcode}): {str(e)}")
+    
+    def _get_barcode_by_id(self, cursor, product_id: int) -> Optional[str]:
+        cursor.execute("SELECT barcode FROM products WHERE id = ?", (product_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
     
     # ==================== ÜRÜN İŞLEMLERİ ====================
     
+    @track_db_query
     def get_product_by_barcode(self, barcode: str) -> Optional[Dict[str, Any]]:
         """Barkod ile ürün sorgula"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
             SELECT * FROM products WHERE barcode = ?
@@ -43,19 +208,87 @@ class Database:
             row = cursor.fetchone()
             return dict(row) if row else None
     
+    @track_db_query
+    def get_products_by_barcodes(self, barcodes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Birden çok barkodu tek sorguda (parametre sınırına göre parçalı) getir"""
+        unique_barcodes = list(dict.fromkeys(barcodes))
+        products = {}
+        
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(unique_barcodes), _MAX_QUERY_PARAMS):
+                chunk = unique_barcodes[start:start + _MAX_QUERY_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"""
+                SELECT * FROM products WHERE barcode IN ({placeholders})
+                """, chunk)
+                for row in cursor.fetchall():
+                    products[row["barcode"]] = dict(row)
+        
+        return products
+    
+    @track_db_query
+    def count_products(self) -> int:
+        """Toplam ürün sayısı"""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM products")
+            return cursor.fetchone()[0]
+    
+    @track_db_query
+    def get_barcode_version(self) -> Tuple[int, int]:
+        """
+        Barkod kümesi sürümü: (ürün eklendiğinde ya da barkod değiştiğinde
+        artan sürüm, yalnızca barkod değiştiğinde artan sayaç)
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version, renamed FROM barcode_version WHERE id = 1")
+            row = cursor.fetchone()
+            return (row[0], row[1]) if row else (0, 0)
+    
+    def iter_barcodes(self, after_id: int = 0, batch_size: int = 10000) -> Iterator[Tuple[int, str]]:
+        """(id, barkod) çiftlerini id sırasıyla parça parça dolaş (after_id'den sonrakiler)"""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, barcode FROM products WHERE id > ? ORDER BY id", (after_id,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row[0], row[1]
+    
+    @track_db_query
     def search_products(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Ürün adı veya marka ile ara"""
-        with self.get_connection() as conn:
+        """Ürün adı, marka veya içindekiler ile ara (FTS5, BM25 sıralı)"""
+        match_expression = _fts_match_expression(query)
+        if not match_expression:
+            return []
+        
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
-            search_term = f"%{query}%"
-            cursor.execute("""
-            SELECT * FROM products 
-            WHERE product_name LIKE ? OR brand LIKE ?
-            LIMIT ?
-            """, (search_term, search_term, limit))
+            try:
+                # Ağırlıklar: ürün adı > marka > içindekiler
+                cursor.execute("""
+                SELECT p.* FROM products_fts
+                JOIN products p ON p.id = products_fts.rowid
+                WHERE products_fts MATCH ?
+                ORDER BY bm25(products_fts, 10.0, 5.0, 1.0)
+                LIMIT ?
+                """, (match_expression, limit))
+            except sqlite3.OperationalError:
+                # FTS5 desteklenmeyen SQLite derlemeleri için
+                search_term = f"%{query}%"
+                cursor.execute("""
+                SELECT * FROM products 
+                WHERE product_name LIKE ? OR brand LIKE ?
+                LIMIT ?
+                """, (search_term, search_term, limit))
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
     
+    @track_db_query
     def create_product(self, product_data: Dict[str, Any]) -> int:
         """Yeni ürün oluştur"""
         with self.get_connection() as conn:
@@ -77,8 +310,12 @@ class Database:
                 product_data.get("ingredients_text"),
                 product_data.get("source")
             ))
-            return cursor.lastrowid
+            product_id = cursor.lastrowid
+        
+        self._notify_product_change("insert", [product_data.get("barcode")])
+        return product_id
     
+    @track_db_query
     def update_product(self, product_id: int, product_data: Dict[str, Any]) -> bool:
         """Ürün güncelle"""
         with self.get_connection() as conn:
@@ -95,35 +332,52 @@ class Database:
             if not updates:
                 return False
             
+            # Elle girilen risk kararı çevrimdışı sınıflandırmayla ezilmesin
+            if {"risk_level", "contains_gluten", "contains_cross_contamination"} & set(product_data):
+                updates.append("ruleset_version = NULL")
+            
             params.append(product_id)
+            old_barcode = self._get_barcode_by_id(cursor, product_id)
             
             query = f"""
             UPDATE products SET {', '.join(updates)}, updated_date = CURRENT_TIMESTAMP
             WHERE id = ?
             """
             cursor.execute(query, params)
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+        
+        if updated:
+            self._notify_product_change("update", [old_barcode, product_data.get("barcode")])
+        return updated
     
+    @track_db_query
     def delete_product(self, product_id: int) -> bool:
         """Ürün sil"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            barcode = self._get_barcode_by_id(cursor, product_id)
             cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        
+        if deleted:
+            self._notify_product_change("delete", [barcode])
+        return deleted
     
     # ==================== GLUTEN TEMİZLEYİCİLERİ ====================
     
+    @track_db_query
     def get_flagged_ingredients(self) -> List[Dict[str, Any]]:
         """Tüm gluten tetikleyicilerini getir"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM flagged_ingredients")
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
     
+    @track_db_query
     def get_dangerous_ingredients(self) -> List[str]:
         """Tehlikeli malzemeleri getir"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
             SELECT ingredient FROM flagged_ingredients 
@@ -131,9 +385,10 @@ class Database:
             """)
             return [row[0] for row in cursor.fetchall()]
     
+    @track_db_query
     def get_risky_keywords(self) -> List[str]:
         """Riskli kelimeleri getir"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
             SELECT ingredient FROM flagged_ingredients 
@@ -141,31 +396,178 @@ class Database:
             """)
             return [row[0] for row in cursor.fetchall()]
     
+    @track_db_query
+    def get_ruleset_version(self) -> int:
+        """Kural seti sürümü (flagged_ingredients her değiştiğinde artar)"""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM ruleset_version WHERE id = 1")
+            row = cursor.fetchone()
+            return row[0] if row else 0
+    
+    @track_db_query
+    def get_ruleset_snapshot(self) -> Dict[str, Any]:
+        """Sürüm ve anahtar kelimeleri aynı okuma işleminde (tutarlı) getir"""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                cursor.execute("SELECT version FROM ruleset_version WHERE id = 1")
+                row = cursor.fetchone()
+                cursor.execute("SELECT ingredient, risk_level FROM flagged_ingredients")
+                rules = cursor.fetchall()
+            finally:
+                conn.rollback()
+        
+        return {
+            "version": row[0] if row else 0,
+            "dangerous": [r["ingredient"] for r in rules if r["risk_level"] == "dangerous"],
+            "risky": [r["ingredient"] for r in rules if r["risk_level"] == "risky"]
+        }
+    
+    # ==================== MALZEME SINIFLANDIRMALARI ====================
+    
+    @track_db_query
+    def get_ingredient_classifications(
+        self, ingredients: List[str], model_name: str
+    ) -> Dict[str, Tuple[str, float]]:
+        """Kalıcı zero-shot sonuçlarını getir: {normalize malzeme: (etiket, skor)}"""
+        results = {}
+        unique_ingredients = list(dict.fromkeys(ingredients))
+        chunk_size = _MAX_QUERY_PARAMS - 1
+        
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(unique_ingredients), chunk_size):
+                chunk = unique_ingredients[start:start + chunk_size]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"""
+                SELECT normalized_ingredient, label, score FROM ingredient_classifications
+                WHERE model_name = ? AND normalized_ingredient IN ({placeholders})
+                """, [model_name, *chunk])
+                for row in cursor.fetchall():
+                    results[row[0]] = (row[1], row[2])
+        
+        return results
+    
+    @track_db_query
+    def save_ingredient_classifications(
+        self,
+        classifications: Dict[str, Tuple[str, float]],
+        model_name: str,
+        ruleset_version: Optional[int] = None
+    ):
+        """Zero-shot sonuçlarını tek işlemde toplu yaz"""
+        if not classifications:
+            return
+        
+        with self.get_connection() as conn:
+            conn.executemany("""
+            INSERT INTO ingredient_classifications
+            (normalized_ingredient, model_name, label, score, ruleset_version)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(normalized_ingredient, model_name) DO UPDATE SET
+                label = excluded.label,
+                score = excluded.score,
+                ruleset_version = excluded.ruleset_version,
+                created_date = CURRENT_TIMESTAMP
+            """, [
+                (ingredient, model_name, label, score, ruleset_version)
+                for ingredient, (label, score) in classifications.items()
+            ])
+    
+    @track_db_query
+    def purge_ingredient_classifications(self, keep_model: str) -> int:
+        """Başka bir modele ait sınıflandırmaları sil"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+            DELETE FROM ingredient_classifications WHERE model_name != ?
+            """, (keep_model,))
+            return cursor.rowcount
+    
+    # ==================== ANALİZ İŞLERİ ====================
+    
+    @track_db_query
+    def create_analysis_job(self, job_id: str):
+        """Kuyruğa alınan analiz işini kaydet"""
+        now = time.time()
+        with self.get_connection() as conn:
+            conn.execute("""
+            INSERT INTO analysis_jobs (id, status, created_at, updated_at)
+            VALUES (?, 'queued', ?, ?)
+            """, (job_id, now, now))
+    
+    @track_db_query
+    def update_analysis_job(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error_code: Optional[int] = None,
+        error_detail: Optional[str] = None
+    ):
+        """İş durumunu (ve varsa sonucu/hatayı) güncelle"""
+        with self.get_connection() as conn:
+            conn.execute("""
+            UPDATE analysis_jobs
+            SET status = ?, result_json = ?, error_code = ?, error_detail = ?, updated_at = ?
+            WHERE id = ?
+            """, (
+                status,
+                json.dumps(result, ensure_ascii=False) if result is not None else None,
+                error_code, error_detail, time.time(), job_id
+            ))
+    
+    @track_db_query
+    def get_analysis_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """İşi getir (sonuç JSON'u çözülmüş olarak)"""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+        
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job.pop("result_json")) if job["result_json"] else None
+        return job
+    
+    @track_db_query
+    def purge_analysis_jobs(self, older_than: float) -> int:
+        """Son güncellemesi verilen zamandan eski işleri sil"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM analysis_jobs WHERE updated_at < ?", (older_than,))
+            return cursor.rowcount
+    
     # ==================== İSTATİSTİKLER ====================
     
+    @track_db_query
     def get_statistics(self) -> Dict[str, Any]:
-        """Veritabanı istatistiklerini getir"""
-        with self.get_connection() as conn:
+        """Veritabanı istatistiklerini getir (trigger'larla tutulan catalog_stats'tan)"""
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM products")
-            total_products = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM products WHERE risk_level = 'safe'")
-            safe_products = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM products WHERE risk_level = 'dangerous'")
-            dangerous_products = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM flagged_ingredients")
-            total_ingredients = cursor.fetchone()[0]
-            
-            return {
-                "total_products": total_products,
-                "safe_products": safe_products,
-                "dangerous_products": dangerous_products,
-                "total_flagged_ingredients": total_ingredients
-            }
+            cursor.execute("SELECT stat, value FROM catalog_stats")
+            stats = dict(cursor.fetchall())
+        
+        sources = {
+            stat.split(":", 1)[1]: value
+            for stat, value in stats.items()
+            if stat.startswith("source:") and value
+        }
+        
+        return {
+            "total_products": stats.get("products", 0),
+            "safe_products": stats.get("risk:safe", 0),
+            "risky_products": stats.get("risk:risky", 0),
+            "dangerous_products": stats.get("risk:dangerous", 0),
+            "certified_products": stats.get("certified", 0),
+            "products_by_source": sources,
+            "total_flagged_ingredients": stats.get("flagged_ingredients", 0),
+            "dangerous_flagged_ingredients": stats.get("flagged:dangerous", 0),
+            "risky_flagged_ingredients": stats.get("flagged:risky", 0)
+        }
 
 
 # Global database instance
@@ -0,0 +1,486 @@
+"""
+Toplu ürün kataloğu içe aktarma
+
+Dosya satır satır okunur (generator hattı: okuma -> doğrulama -> toplu
+yazma), hiçbir aşamada tamamı belleğe alınmaz. Satırlar `executemany` ile
+barkoda göre upsert edilir ve her parça ayrı işlemde commit edilir (API
+yazmaları parçalar arasında araya girebilir). Yükleme süresince FTS ve
+katalog istatistik trigger'ları ile ikincil indeksler kaldırılır; sonda
+ayrı bir işlemde tek seferde yeniden kurulur. Yükleme hatayla yarıda
+kalırsa da yeniden kurulur; commit edilmiş parçalar kalır, dosya tekrar
+çalıştırılabilir (upsert). Süreç öldürülürse (SIGKILL, OOM) trigger'larla
+aynı işlemde yazılan `pending_rebuilds` işareti kalır ve bir sonraki
+`init_database` (sunucu ya da içe aktarma başlangıcı) yeniden oluşturmayı
+tamamlar.
+
+Desteklenen biçimler (uzantıdan tahmin edilir, `.gz` desteklenir):
+
+- jsonl: satır başına bir JSON nesnesi (products tablosu sütun adları)
+- csv:   başlık satırlı CSV (aynı sütun adları)
+- off:   Open Food Facts dışa aktarımı (sekmeyle ayrılmış CSV ya da JSONL)
+
+Kullanım:
+    python -m db.importer urunler.jsonl
+    python -m db.importer en.openfoodfacts.org.products.csv.gz --format off --source openfoodfacts
+    python -m db.importer yeni.csv --no-defer --skip-existing   # küçük artımlı yükleme
+    python -m db.importer --reclassify                          # kural seti değişti
+
+Risk bilgisi olmayan ürünler `ruleset_version = 0` (beklemede) olarak
+yazılır ve yükleme sonunda `services.catalog_classifier` ile tüm
+çekirdeklerde kural motorundan geçirilir (`--no-classify` ile atlanır).
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import sqlite3
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import settings
+from db.init_db import (
+    PENDING_REBUILDS,
+    PRODUCT_INDEXES,
+    create_catalog_stats,
+    create_product_indexes,
+    create_products_fts,
+    init_database,
+    rebuild_catalog_stats,
+    rebuild_products_fts,
+)
+from utils.validators import validate_barcode, validate_product_name
+
+
+# Risk bilgisi olmayan ve türetilemeyen ürünler: çölyak hastası için
+# "güvenli" varsaymak yerine doğrulanana kadar riskli sayılır
+DEFAULT_RISK_LEVEL = "risky"
+
+PRODUCT_COLUMNS = (
+    "barcode", "product_name", "brand", "risk_level", "contains_gluten",
+    "contains_cross_contamination", "certified_gluten_free", "ingredients_text", "source",
+    "ruleset_version",
+)
+
+# ruleset_version: kararı kaynaktan gelen ürün NULL, kural motorunu bekleyen 0
+PENDING_CLASSIFICATION = 0
+
+# Yükleme süresince kaldırılan, satır başına çalışan trigger'lar
+DEFERRED_TRIGGERS = (
+    "products_fts_insert", "products_fts_delete", "products_fts_update",
+    "products_stats_insert", "products_stats_delete", "products_stats_update",
+)
+
+TRUE_VALUES = {"1", "true", "yes", "y", "evet", "e", "t"}
+FALSE_VALUES = {"0", "false", "no", "n", "hayır", "hayir", "h", "f", ""}
+
+# OFF etiketleri (allergens_tags, traces_tags, labels_tags)
+OFF_GLUTEN_TAG = "en:gluten"
+OFF_GLUTEN_FREE_LABELS = {"en:no-gluten", "en:gluten-free", "fr:sans-gluten"}
+
+
+class InvalidRow(ValueError):
+    """Doğrulamadan geçmeyen satır (atlanır ve raporlanır)"""
+
+
+# ==================== OKUYUCULAR ====================
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", errors="replace", newline="")
+    return open(path, encoding="utf-8", errors="replace", newline="")
+
+
+def _is_jsonl(path: Path) -> bool:
+    suffixes = [s for s in path.suffixes if s != ".gz"]
+    return bool(suffixes) and suffixes[-1] in (".jsonl", ".json", ".ndjson")
+
+
+def read_jsonl(path: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(satır no, kayıt) üretir; bozuk JSON satırı InvalidRow olarak iletilir"""
+    with _open_text(path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, InvalidRow(f"JSON hatası: {e.msg}")
+                continue
+            yield line_no, record
+
+
+def read_csv(path: Path, delimiter: str = ",") -> Iterator[Tuple[int, Dict[str, Any]]]:
+    # OFF gibi dışa aktarımlarda tek bir alan varsayılan 128 KB sınırını aşabilir
+    csv.field_size_limit(sys.maxsize)
+    with _open_text(path) as f:
+        reader = csv.DictReader(f, delimiter=delimiter, quoting=csv.QUOTE_MINIMAL)
+        for line_no, record in enumerate(reader, 2):
+            yield line_no, record
+
+
+def read_records(path: Path, fmt: str, delimiter: Optional[str] = None):
+    """Biçime göre (satır no, ham kayıt) üreteci"""
+    if fmt == "jsonl" or (fmt == "off" and _is_jsonl(path)):
+        return read_jsonl(path)
+    if fmt == "off":
+        return read_csv(path, delimiter or "\t")
+    return read_csv(path, delimiter or ",")
+
+
+def detect_format(path: Path) -> str:
+    if _is_jsonl(path):
+        return "jsonl"
+    if "openfoodfacts" in path.name.lower():
+        return "off"
+    return "csv"
+
+
+# ==================== DOĞRULAMA ====================
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _bool(value: Any, field: str) -> Optional[bool]:
+    """Boş değer için None; tanınmayan değer InvalidRow"""
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if not text:
+        return None
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise InvalidRow(f"{field} mantıksal değer değil: {value!r}")
+
+
+def _tags(value: Any) -> set:
+    """OFF etiket alanı: liste ya da virgülle ayrılmış metin"""
+    if not value:
+        return set()
+    if isinstance(value, str):
+        value = value.split(",")
+    return {str(tag).strip().lower() for tag in value if str(tag).strip()}
+
+
+def from_off_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Open Food Facts kaydını products sütunlarına eşle (Türkçe alanlar öncelikli)"""
+    allergens = _tags(record.get("allergens_tags")) | _tags(record.get("allergens"))
+    traces = _tags(record.get("traces_tags")) | _tags(record.get("traces"))
+    labels = _tags(record.get("labels_tags"))
+    brands = _text(record.get("brands"))
+    return {
+        "barcode": record.get("code"),
+        "product_name": record.get("product_name_tr") or record.get("product_name"),
+        "brand": brands.split(",")[0].strip() if brands else None,
+        "ingredients_text": record.get("ingredients_text_tr") or record.get("ingredients_text"),
+        "contains_gluten": True if OFF_GLUTEN_TAG in allergens else None,
+        "contains_cross_contamination": True if OFF_GLUTEN_TAG in traces else None,
+        "certified_gluten_free": bool(labels & OFF_GLUTEN_FREE_LABELS),
+    }
+
+
+def derive_risk_level(contains_gluten: Optional[bool], cross_contamination: Optional[bool],
+                      certified: Optional[bool]) -> Optional[str]:
+    """Bayraklardan risk seviyesi; bilgi yoksa None"""
+    if contains_gluten:
+        return "dangerous"
+    if cross_contamination:
+        return "risky"
+    if certified:
+        return "safe"
+    return None
+
+
+def normalize_record(record: Dict[str, Any], default_source: str) -> Tuple[tuple, bool]:
+    """
+    Ham kaydı doğrula ve PRODUCT_COLUMNS sırasında satıra çevir
+
+    Returns:
+        (satır, risk seviyesi varsayılan mı)
+
+    Raises:
+        InvalidRow
+    """
+    barcode = _text(record.get("barcode"))
+    if barcode is None:
+        raise InvalidRow("barkod yok")
+    is_valid, message = validate_barcode(barcode)
+    if not is_valid:
+        raise InvalidRow(f"{barcode}: {message}")
+
+    product_name = _text(record.get("product_name"))
+    is_valid, message = validate_product_name(product_name)
+    if not is_valid:
+        raise InvalidRow(f"{barcode}: {message}")
+
+    contains_gluten = _bool(record.get("contains_gluten"), "contains_gluten")
+    cross = _bool(record.get("contains_cross_contamination"), "contains_cross_contamination")
+    certified = _bool(record.get("certified_gluten_free"), "certified_gluten_free")
+
+    risk_level = _text(record.get("risk_level"))
+    defaulted = False
+    if risk_level is None:
+        risk_level = derive_risk_level(contains_gluten, cross, certified)
+    if risk_level is None:
+        risk_level, defaulted = DEFAULT_RISK_LEVEL, True
+    risk_level = risk_level.lower()
+    if risk_level not in ("safe", "risky", "dangerous"):
+        raise InvalidRow(f"{barcode}: geçersiz risk seviyesi {risk_level!r}")
+
+    if contains_gluten is None:
+        contains_gluten = risk_level == "dangerous"
+
+    row = (
+        barcode,
+        product_name,
+        _text(record.get("brand")),
+        risk_level,
+        contains_gluten,
+        bool(cross),
+        bool(certified),
+        _text(record.get("ingredients_text")),
+        _text(record.get("source")) or default_source,
+        PENDING_CLASSIFICATION if defaulted else None,
+    )
+    return row, defaulted
+
+
+def _batches(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ==================== YAZMA ====================
+
+def _upsert_sql(on_conflict: str) -> str:
+    placeholders = ", ".join("?" for _ in PRODUCT_COLUMNS)
+    sql = f"INSERT INTO products ({', '.join(PRODUCT_COLUMNS)}) VALUES ({placeholders}) ON CONFLICT(barcode) DO "
+    if on_conflict == "skip":
+        return sql + "NOTHING"
+    updates = ", ".join(f"{column} = excluded.{column}" for column in PRODUCT_COLUMNS if column != "barcode")
+    return sql + f"UPDATE SET {updates}, updated_date = CURRENT_TIMESTAMP"
+
+
+def _apply_bulk_pragmas(conn: sqlite3.Connection):
+    """Yalnızca bu bağlantı için: içe aktarma yarıda kalırsa dosya yeniden çalıştırılır"""
+    conn.execute(f"PRAGMA busy_timeout = {settings.db_busy_timeout}")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")  # 256 MB
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+
+def _drop_deferred(cursor):
+    # İşaret aynı işlemde yazılır: süreç öldürülürse init_database yeniden oluşturur
+    cursor.executemany(
+        "INSERT OR IGNORE INTO pending_rebuilds (name) VALUES (?)",
+        [(name,) for name in PENDING_REBUILDS]
+    )
+    for trigger in DEFERRED_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    for index in PRODUCT_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+def _restore_deferred(cursor):
+    """İndeksleri, FTS'i ve sayaçları tek seferde yeniden kur, trigger'ları geri ekle"""
+    create_product_indexes(cursor)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+    if cursor.fetchone() is not None:
+        rebuild_products_fts(cursor)
+        create_products_fts(cursor)
+    rebuild_catalog_stats(cursor)
+    create_catalog_stats(cursor)
+    cursor.execute("DELETE FROM pending_rebuilds")
+
+
+def import_records(records: Iterable[Tuple[int, Any]], default_source: str = "import",
+                   on_conflict: str = "update", defer_indexes: bool = True,
+                   batch_size: int = 10_000, off: bool = False, progress: bool = True, max_error_lines: int = 10) -> Dict[str, Any]:
+    """
+    (satır no, ham kayıt) akışını products tablosuna yaz
+
+    Args:
+        on_conflict: "update" (barkod varsa güncelle) ya da "skip"
+        defer_indexes: FTS/istatistik trigger'larını ve indeksleri sona ertele
+            (büyük yüklemeler için; küçük artımlı yüklemede tüm katalog
+            yeniden kurulacağından False daha hızlıdır)
+        batch_size: executemany ve işlem (commit) başına satır
+        off: kayıtlar Open Food Facts biçiminde
+
+    Returns:
+        {"read", "written", "skipped", "invalid", "defaulted_risk", "seconds", "rows_per_second", ...}
+    """
+    # Şema eksikse önce tabloları ve trigger'ları oluştur
+    init_database()
+
+    stats = {"read": 0, "written": 0, "skipped": 0, "invalid": 0, "defaulted_risk": 0}
+    errors: List[str] = []
+
+    def valid_rows():
+        for line_no, record in records:
+            stats["read"] += 1
+            try:
+                if isinstance(record, InvalidRow):
+                    raise record
+                row, defaulted = normalize_record(
+                    from_off_record(record) if off else record, default_source
+                )
+            except InvalidRow as e:
+                stats["invalid"] += 1
+                if len(errors) < max_error_lines:
+                    errors.append(f"satır {line_no}: {e}")
+                continue
+            stats["defaulted_risk"] += defaulted
+            yield row
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(settings.database_path, isolation_level=None)
+    try:
+        _apply_bulk_pragmas(conn)
+        cursor = conn.cursor()
+        sql = _upsert_sql(on_conflict)
+
+        def transaction(func, *args):
+            # Yazma kilidi yalnızca işlem süresince tutulur; API yazmaları araya girer
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(*args)
+                cursor.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+                raise
+            return result
+
+        def upsert(batch):
+            # rowcount trigger'ların yaptığı değişiklikleri saymaz; DO NOTHING satırları 0'dır
+            return max(cursor.executemany(sql, batch).rowcount, 0)
+
+        if defer_indexes:
+            transaction(_drop_deferred, cursor)
+        try:
+            last_report = started
+            for batch in _batches(valid_rows(), batch_size):
+                changed = transaction(upsert, batch)
+                stats["written"] += changed
+                stats["skipped"] += len(batch) - changed
+
+                now = time.perf_counter()
+                if progress and now - last_report >= 5:
+                    rate = stats["read"] / (now - started)
+                    print(f"   ⏳ {stats['read']:,} satır okundu ({rate:,.0f} satır/sn)")
+                    last_report = now
+            load_seconds = time.perf_counter() - started
+        finally:
+            # Yükleme yarıda kalsa da trigger'lar ve indeksler geri gelir;
+            # aradaki API yazmaları dahil tüm katalog yeniden taranır
+            if defer_indexes:
+                transaction(_restore_deferred, cursor)
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - started
+    stats.update({
+        "seconds": round(seconds, 3),
+        "load_seconds": round(load_seconds, 3),
+        "rebuild_seconds": round(seconds - load_seconds, 3),
+        "rows_per_second": round(stats["read"] / seconds, 1) if seconds > 0 else 0.0,
+        "errors": errors,
+    })
+    return stats
+
+
+def import_file(path, fmt: Optional[str] = None, delimiter: Optional[str] = None, **options) -> Dict[str, Any]:
+    """Dosyayı biçimine göre okuyup içe aktar (bkz. import_records)"""
+    path = Path(path)
+    fmt = fmt or detect_format(path)
+    return import_records(read_records(path, fmt, delimiter), off=fmt == "off", **options)
+
+
+def print_report(stats: Dict[str, Any]):
+    print(f"📖 Okunan: {stats['read']:,}")
+    print(f"✅ Yazılan: {stats['written']:,}")
+    if stats["skipped"]:
+        print(f"⏭️  Atlanan (barkod zaten var): {stats['skipped']:,}")
+    if stats["defaulted_risk"]:
+        print(f"🟡 Risk bilgisi olmadığı için '{DEFAULT_RISK_LEVEL}' sayılan: {stats['defaulted_risk']:,}")
+    if stats["invalid"]:
+        print(f"❌ Geçersiz: {stats['invalid']:,}")
+        for error in stats["errors"]:
+            print(f"   {error}")
+    print(
+        f"⏱️  {stats['seconds']:.1f} sn (yükleme {stats['load_seconds']:.1f} sn, "
+        f"indeks/FTS/istatistik {stats['rebuild_seconds']:.1f} sn) - "
+        f"{stats['rows_per_second']:,.0f} satır/sn"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ürün kataloğunu JSONL/CSV/Open Food Facts dosyasından içe aktar",
+        epilog=(
+            "İçe aktarma öldürülürse (SIGKILL, OOM) FTS indeksi ve katalog sayaçları bir sonraki "
+            "sunucu ya da içe aktarma başlangıcında otomatik yeniden oluşturulur. Elle: "
+            "python -m db.maintenance rebuild-fts && python -m db.maintenance rebuild-stats"
+        )
+    )
+    parser.add_argument("path", type=Path, nargs="?", help="Kaynak dosya (.gz olabilir)")
+    parser.add_argument("--format", choices=["jsonl", "csv", "off"], help="Varsayılan: uzantıdan tahmin")
+    parser.add_argument("--delimiter", help="CSV ayırıcı (varsayılan: csv için ',', off için sekme)")
+    parser.add_argument("--source", default="import", help="Kayıtta kaynak yoksa yazılacak değer")
+    parser.add_argument("--skip-existing", action="store_true", help="Var olan barkodları güncelleme")
+    parser.add_argument("--no-defer", action="store_true",
+                        help="Trigger ve indeksleri kaldırma (küçük artımlı yüklemeler için)")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="İşlem (commit) başına satır")
+    parser.add_argument("--no-classify", action="store_true",
+                        help="Risk bilgisi olmayan ürünleri kural motoruyla sınıflandırma")
+    parser.add_argument("--reclassify", action="store_true",
+                        help="Eski kural seti sürümüyle verilmiş kararları da yenile (dosya olmadan da çalışır)")
+    parser.add_argument("--workers", type=int, help="Sınıflandırma süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--chunk-size", type=int, default=5_000, help="Süreç başına parça boyutu")
+    args = parser.parse_args()
+
+    if args.path is None and not args.reclassify:
+        parser.error("kaynak dosya ya da --reclassify gerekli")
+
+    if args.path is not None:
+        fmt = args.format or detect_format(args.path)
+        print(f"🚀 İçe aktarılıyor: {args.path} ({fmt})")
+        stats = import_file(
+            args.path, fmt, args.delimiter,
+            default_source=args.source,
+            on_conflict="skip" if args.skip_existing else "update",
+            defer_indexes=not args.no_defer,
+            batch_size=args.batch_size,
+        )
+        print_report(stats)
+
+    if args.reclassify or not args.no_classify:
+        # Kural motoru (services) yalnızca sınıflandırma aşamasında yüklenir
+        from services.catalog_classifier import classify_catalog, print_report as print_classify_report
+
+        print("🏷️  Risk sınıflandırması (kural motoru)...")
+        print_classify_report(classify_catalog(
+            reclassify=args.reclassify, workers=args.workers, chunk_size=args.chunk_size
+        ))
+
+
+if __name__ == "__main__":
+    main()
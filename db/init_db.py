@@ -10,6 +10,274 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import settings
 
 
+def _fts_fold(column: str) -> str:
+    """FTS'e yazılan değer: unicode61 büyük/küçük harf ve aksanları zaten
+    katlar, yalnızca noktasız ı ayrıca i'ye çevrilir (bkz. utils.helpers.fold_turkish)"""
+    return f"replace(coalesce({column}, ''), 'ı', 'i')"
+
+
+def _fts_values(prefix: str) -> str:
+    return ", ".join(
+        _fts_fold(f"{prefix}.{column}")
+        for column in ("product_name", "brand", "ingredients_text")
+    )
+
+
+def add_column_if_missing(cursor, table: str, column: str, definition: str):
+    """Eski veritabanlarına sonradan eklenen sütun"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def create_ruleset_version(cursor):
+    """Kural seti sürüm sayacı ve flagged_ingredients trigger'ları"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS ruleset_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL,
+        updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+    cursor.execute("INSERT OR IGNORE INTO ruleset_version (id, version) VALUES (1, 1)")
+    
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS flagged_ingredients_version_{event.lower()}
+        AFTER {event} ON flagged_ingredients BEGIN
+            UPDATE ruleset_version
+            SET version = version + 1, updated_date = CURRENT_TIMESTAMP
+            WHERE id = 1;
+        END;
+        """)
+
+
+def create_barcode_version(cursor):
+    """
+    Barkod kümesi sürüm sayacı: yeni ürün ya da barkod değişikliğinde artar.
+    `renamed` yalnızca barkod değişikliğinde artar; yeni ürünler id'lerinden
+    bulunabildiği halde değişen barkodlar için tam tarama gerekir.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS barcode_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL,
+        renamed INTEGER NOT NULL DEFAULT 0
+    );
+    """)
+    add_column_if_missing(cursor, "barcode_version", "renamed", "INTEGER NOT NULL DEFAULT 0")
+    cursor.execute("INSERT OR IGNORE INTO barcode_version (id, version) VALUES (1, 1)")
+    
+    for name, event in (("insert", "INSERT"), ("update", "UPDATE OF barcode")):
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS products_barcode_version_{name}
+        AFTER {event} ON products BEGIN
+            UPDATE barcode_version SET version = version + 1 WHERE id = 1;
+        END;
+        """)
+    
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS products_barcode_renamed
+    AFTER UPDATE OF barcode ON products BEGIN
+        UPDATE barcode_version SET renamed = renamed + 1 WHERE id = 1;
+    END;
+    """)
+
+
+def create_products_fts(cursor) -> bool:
+    """
+    Ürün adı, marka ve içindekiler üzerinde FTS5 indeksi ve senkron
+    tutan trigger'ları oluştur. Tablo yeni oluşturulduysa mevcut ürünlerle
+    doldurulur. FTS5 desteklenmiyorsa False döner (arama LIKE'a düşer).
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+    exists = cursor.fetchone() is not None
+    
+    try:
+        # İçeriksiz (contentless) tablo: metin products'ta tutulur, burada yalnızca indeks
+        cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            product_name, brand, ingredients_text,
+            content='',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        );
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"⚠️  FTS5 kullanılamıyor, arama LIKE ile yapılacak: {e}")
+        return False
+    
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, product_name, brand, ingredients_text)
+        VALUES (new.id, {_fts_values("new")});
+    END;
+    """)
+    
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, product_name, brand, ingredients_text)
+        VALUES ('delete', old.id, {_fts_values("old")});
+    END;
+    """)
+    
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_update
+    AFTER UPDATE OF product_name, brand, ingredients_text ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, product_name, brand, ingredients_text)
+        VALUES ('delete', old.id, {_fts_values("old")});
+        INSERT INTO products_fts(rowid, product_name, brand, ingredients_text)
+        VALUES (new.id, {_fts_values("new")});
+    END;
+    """)
+    
+    if not exists:
+        rebuild_products_fts(cursor)
+    
+    return True
+
+
+def rebuild_products_fts(cursor):
+    """FTS indeksini products tablosundan baştan oluştur"""
+    cursor.execute("INSERT INTO products_fts(products_fts) VALUES ('delete-all')")
+    cursor.execute(f"""
+    INSERT INTO products_fts(rowid, product_name, brand, ingredients_text)
+    SELECT id, {_fts_values("products")} FROM products
+    """)
+
+
+def _product_stat_rows(prefix: str, sign: str) -> str:
+    """Bir ürün satırının katkısı: toplam, risk seviyesi, kaynak ve sertifika sayaçları"""
+    return f"""
+        ('products', {sign}1),
+        ('risk:' || {prefix}.risk_level, {sign}1),
+        ('source:' || coalesce({prefix}.source, 'unknown'), {sign}1),
+        ('certified', {sign}(coalesce({prefix}.certified_gluten_free, 0) != 0))
+    """
+
+
+def _flagged_stat_rows(prefix: str, sign: str) -> str:
+    return f"""
+        ('flagged_ingredients', {sign}1),
+        ('flagged:' || {prefix}.risk_level, {sign}1)
+    """
+
+
+def _stats_upsert(rows: str) -> str:
+    return f"""
+    INSERT INTO catalog_stats (stat, value) VALUES {rows}
+    ON CONFLICT(stat) DO UPDATE SET value = value + excluded.value;
+    """
+
+
+def create_catalog_stats(cursor):
+    """
+    products ve flagged_ingredients sayaçlarını tutan tablo ve trigger'lar;
+    istatistikler COUNT(*) taraması yerine birkaç satırdan okunur. Tablo yeni
+    oluşturulduysa mevcut verilerden doldurulur.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'catalog_stats'")
+    exists = cursor.fetchone() is not None
+    
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS catalog_stats (
+        stat TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID;
+    """)
+    
+    triggers = {
+        "products": (_product_stat_rows, "risk_level, source, certified_gluten_free"),
+        "flagged_ingredients": (_flagged_stat_rows, "risk_level"),
+    }
+    for table, (stat_rows, columns) in triggers.items():
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_stats_insert AFTER INSERT ON {table} BEGIN
+            {_stats_upsert(stat_rows("new", "+"))}
+        END;
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_stats_delete AFTER DELETE ON {table} BEGIN
+            {_stats_upsert(stat_rows("old", "-"))}
+        END;
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_stats_update AFTER UPDATE OF {columns} ON {table} BEGIN
+            {_stats_upsert(stat_rows("old", "-"))}
+            {_stats_upsert(stat_rows("new", "+"))}
+        END;
+        """)
+    
+    if not exists:
+        rebuild_catalog_stats(cursor)
+
+
+def rebuild_catalog_stats(cursor):
+    """Sayaçları products ve flagged_ingredients tablolarından baştan hesapla"""
+    cursor.execute("DELETE FROM catalog_stats")
+    cursor.execute("""
+    INSERT INTO catalog_stats (stat, value)
+    SELECT 'products', COUNT(*) FROM products
+    UNION ALL
+    SELECT 'certified', COUNT(*) FROM products WHERE coalesce(certified_gluten_free, 0) != 0
+    UNION ALL
+    SELECT 'risk:' || risk_level, COUNT(*) FROM products GROUP BY risk_level
+    UNION ALL
+    SELECT 'source:' || coalesce(source, 'unknown'), COUNT(*) FROM products GROUP BY coalesce(source, 'unknown')
+    UNION ALL
+    SELECT 'flagged_ingredients', COUNT(*) FROM flagged_ingredients
+    UNION ALL
+    SELECT 'flagged:' || risk_level, COUNT(*) FROM flagged_ingredients GROUP BY risk_level
+    """)
+
+
+# Toplu içe aktarmada yükleme süresince kaldırılıp sonda yeniden kurulan
+# ikincil indeksler (barcode UNIQUE kısıtının indeksi upsert için kalır)
+PRODUCT_INDEXES = {
+    "idx_barcode": "products(barcode)",
+    "idx_product_name": "products(product_name)",
+}
+
+
+def create_product_indexes(cursor):
+    """products tablosunun ikincil indeksleri"""
+    for name, target in PRODUCT_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+# Toplu içe aktarma trigger'ları kaldırırken aynı işlemde buraya yazar ve
+# yeniden kurduğu işlemde siler; süreç arada öldürülürse (SIGKILL, OOM)
+# kayıtlar kalır ve bir sonraki init_database yeniden oluşturmayı tamamlar
+PENDING_REBUILDS = {
+    "products_fts": rebuild_products_fts,
+    "catalog_stats": rebuild_catalog_stats,
+}
+
+
+def create_pending_rebuilds(cursor):
+    """Yarıda kalan yeniden oluşturmaların işaret tablosu"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pending_rebuilds (
+        name TEXT PRIMARY KEY,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+
+
+def run_pending_rebuilds(cursor) -> list:
+    """İşaretli yeniden oluşturmaları çalıştır ve işaretleri sil (trigger'lar zaten kurulu olmalı)"""
+    cursor.execute("SELECT name FROM pending_rebuilds ORDER BY name")
+    names = [row[0] for row in cursor.fetchall()]
+    for name in names:
+        if name == "products_fts":
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+            if cursor.fetchone() is None:
+                continue
+        PENDING_REBUILDS[name](cursor)
+    cursor.execute("DELETE FROM pending_rebuilds")
+    return names
+
+
 def init_database():
     """Veritabanını oluştur ve tabloları başlat"""
     
@@ -34,11 +302,16 @@ def init_database():
         ingredients_text TEXT,
         certified_gluten_free BOOLEAN DEFAULT 0,
         source TEXT,
+        ruleset_version INTEGER,
         added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
     """)
     
+    # Riski kural motoruyla belirlenen ürünlerde o kural setinin sürümü;
+    # NULL = elle/kaynaktan gelen karar, 0 = sınıflandırma bekliyor
+    add_column_if_missing(cursor, "products", "ruleset_version", "INTEGER")
+    
     # 2. GLUTEN TEMİZLEYİCİLERİ TABLOSU
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS flagged_ingredients (
@@ -51,19 +324,70 @@ def init_database():
     );
     """)
     
-    # 3. İNDEKSLER
+    # 3. KURAL SETİ SÜRÜMÜ
+    # flagged_ingredients her değiştiğinde artar; NLP worker'ları bu sayacı
+    # yoklayarak kural setini yeniden yükler
+    create_ruleset_version(cursor)
+    
+    # 4. MALZEME SINIFLANDIRMA ÖNBELLEĞİ
+    # Zero-shot model sonuçları; model adı anahtarın parçası olduğundan
+    # settings.nlp_model değişince eski kayıtlar hiç okunmaz
     cursor.execute("""
-    CREATE INDEX IF NOT EXISTS idx_barcode ON products(barcode);
+    CREATE TABLE IF NOT EXISTS ingredient_classifications (
+        normalized_ingredient TEXT NOT NULL,
+        model_name TEXT NOT NULL,
+        label TEXT NOT NULL,
+        score REAL NOT NULL,
+        ruleset_version INTEGER,
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (normalized_ingredient, model_name)
+    ) WITHOUT ROWID;
     """)
     
+    # 5. ASENKRON ANALİZ İŞLERİ
+    # İş durumu veritabanında tutulur; böylece işi kabul etmeyen bir
+    # worker süreci de sorgulamaya yanıt verebilir
     cursor.execute("""
-    CREATE INDEX IF NOT EXISTS idx_product_name ON products(product_name);
+    CREATE TABLE IF NOT EXISTS analysis_jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL CHECK(status IN ('queued', 'processing', 'done', 'failed')),
+        result_json TEXT,
+        error_code INTEGER,
+        error_detail TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
     """)
     
+    # 6. KATALOG İSTATİSTİKLERİ
+    # Trigger'larla güncel tutulan sayaçlar (/health ve /api/v1/scan/stats)
+    create_catalog_stats(cursor)
+    
+    # Barkod sürümü: her worker'ın Bloom filtresi bu sayacı yoklayarak
+    # başka süreçlerin eklediği ürünleri fark eder
+    create_barcode_version(cursor)
+    
+    # Yarıda kalmış toplu içe aktarmanın işaretleri
+    create_pending_rebuilds(cursor)
+    
+    # 7. İNDEKSLER
+    create_product_indexes(cursor)
+    
     cursor.execute("""
     CREATE INDEX IF NOT EXISTS idx_ingredient ON flagged_ingredients(ingredient);
     """)
     
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_classification_model ON ingredient_classifications(model_name);
+    """)
+    
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_analysis_jobs_updated ON analysis_jobs(updated_at);
+    """)
+    
+    # 8. TAM METİN ARAMA (FTS5)
+    create_products_fts(cursor)
+    
     # ==================== BAŞLANGIÇ VERİLERİ ====================
     
     # Gluten tetikleyicileri
@@ -111,6 +435,14 @@ def init_database():
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (barcode, name, brand, risk, gluten, cross, certified, ingredients, source))
     
+    # ==================== YARIDA KALAN İÇE AKTARMA ====================
+    
+    # Trigger'lar ve indeksler yukarıda yeniden oluşturuldu; aradaki yazmaların
+    # eksik kaldığı FTS ve sayaçlar burada baştan kurulur
+    recovered = run_pending_rebuilds(cursor)
+    if recovered:
+        print(f"⚠️  Yarıda kalmış içe aktarma tamamlandı, yeniden oluşturuldu: {', '.join(recovered)}")
+    
     conn.commit()
     conn.close()
     
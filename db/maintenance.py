@@ -0,0 +1,52 @@
+"""
+Veritabanı bakım komutları
+
+Kullanım:
+    python -m db.maintenance rebuild-stats   # catalog_stats sayaçlarını baştan hesapla
+    python -m db.maintenance rebuild-fts     # products_fts indeksini baştan oluştur
+"""
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import settings
+from db.init_db import init_database, rebuild_catalog_stats, rebuild_products_fts
+
+
+COMMANDS = {
+    "rebuild-stats": (rebuild_catalog_stats, "Katalog istatistikleri yeniden hesaplandı"),
+    "rebuild-fts": (rebuild_products_fts, "Tam metin arama indeksi yeniden oluşturuldu"),
+}
+
+
+def run(command: str):
+    """Bakım komutunu tek işlemde çalıştır"""
+    rebuild, message = COMMANDS[command]
+
+    # Şema eksikse (eski veritabanı) önce tabloları ve trigger'ları oluştur
+    init_database()
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(settings.database_path)
+    try:
+        conn.execute(f"PRAGMA busy_timeout = {settings.db_busy_timeout}")
+        rebuild(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+
+    print(f"✅ {message} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Veritabanı bakım komutları")
+    parser.add_argument("command", choices=sorted(COMMANDS), help="Çalıştırılacak komut")
+    args = parser.parse_args()
+    run(args.command)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Gunicorn ayarları
+
+Kullanım:
+    PROMETHEUS_MULTIPROC_DIR=/tmp/gluten-metrics gunicorn -c gunicorn.conf.py main:app
+"""
+import os
+from pathlib import Path
+
+from utils.metrics import mark_process_dead
+
+
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+
+
+def on_starting(server):
+    """Önceki çalıştırmadan kalan metrik dosyalarını temizle"""
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        Path(metrics_dir).mkdir(parents=True, exist_ok=True)
+        for path in Path(metrics_dir).glob("*.db"):
+            path.unlink()
+
+
+def child_exit(server, worker):
+    """Ölen worker'ın canlı gauge değerlerini (ör. ocr_in_flight) düşür"""
+    mark_process_dead(worker.pid)
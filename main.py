@@ -3,6 +3,7 @@ FastAPI Ana Dosyası - Glutensiz Yaşam Rehberi
 """
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 import sys
 from pathlib import Path
@@ -11,7 +12,17 @@ from pathlib import Path
 from config import settings
 from db.init_db import init_database
 from db.database import db
+from db.async_database import async_db
+from services.barcode_service import barcode_service
+from services.ruleset import ruleset_manager
+from services.ocr_engine import HAS_EASYOCR
+from services.ocr_pool import ocr_pool
+from services.result_cache import image_cache
+from services.analysis_jobs import job_manager
+from services.readiness import readiness
 from utils.logger import logger
+from utils.metrics import HAS_PROMETHEUS, render_metrics
+from utils.middleware import MetricsMiddleware, ServerTimingMiddleware, UploadSizeLimitMiddleware
 
 # Routes
 from routes import barcode, ingredients, products
@@ -25,12 +36,26 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Uygulama başlatılıyor...")
     init_database()
     logger.info("✅ Veritabanı hazır")
+    await barcode_service.start()
+    await ruleset_manager.start()
+    if settings.ocr_pool_enabled and HAS_EASYOCR:
+        ocr_pool.start()
+    await job_manager.start()
+    await readiness.start()
     logger.info("🟢 API çalışıyor")
     
     yield
     
     # SHUTDOWN
     logger.info("🛑 Uygulama kapatılıyor...")
+    await readiness.stop()
+    await job_manager.stop()
+    ocr_pool.shutdown()
+    await ruleset_manager.stop()
+    await barcode_service.stop()
+    async_db.shutdown()
+    image_cache.close()
+    db.close()
 
 
 # ==================== FASTAPI UYGULAMASI ====================
@@ -53,8 +78,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# ==================== YÜKLEME BOYUTU SINIRI ====================
+
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_upload_size=settings.max_upload_size,
+    path_prefixes=("/api/v1/analyze",)
+)
+
+# ==================== METRİKLER ====================
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# ==================== İSTEK ZAMANLAMASI ====================
+
+# Yükleme sınırından sonra eklenir (dışta kalır): gövde okuma süresi `upload` olarak ölçülür
+if settings.server_timing_enabled:
+    app.add_middleware(ServerTimingMiddleware)
+
 # ==================== ROUTES ====================
 
 # Barkod tarama
@@ -82,7 +127,9 @@ async def root():
         "documentation": "/docs",
         "endpoints": {
             "barcode_scan": "/api/v1/scan/barcode",
+            "bulk_barcode_scan": "/api/v1/scan/barcodes",
             "ingredients_analysis": "/api/v1/analyze/ingredients",
+            "ingredients_analysis_jobs": "/api/v1/analyze/jobs",
             "product_search": "/api/v1/products/search"
         }
     }
@@ -93,7 +140,7 @@ async def health_check():
     """Sağlık kontrolü endpoint'i"""
     try:
         # Veritabanı bağlantısını test et
-        stats = db.get_statistics()
+        stats = await async_db.get_statistics()
         
         return {
             "status": "healthy",
@@ -109,6 +156,42 @@ async def health_check():
         }
 
 
+@app.get("/ready", summary="Hazırlık Kontrolü")
+async def readiness_check():
+    """Tüm bileşenler (veritabanı, kural seti, ısıtılan modeller) hazır mı?"""
+    ready = readiness.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "components": readiness.components}
+    )
+
+
+@app.get("/ready/{component}", summary="Bileşen Hazırlık Kontrolü")
+async def component_readiness_check(component: str):
+    """Tek bileşenin hazırlığı (ör. OCR trafiği için /ready/ocr)"""
+    if component not in readiness.components:
+        return JSONResponse(status_code=404, content={"status": "unknown_component", "component": component})
+    
+    ready = readiness.is_ready(component)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", component: readiness.components[component]}
+    )
+
+
+@app.get("/metrics", summary="Prometheus Metrikleri", include_in_schema=False)
+async def metrics():
+    """Prometheus metin formatında metrikler (tüm worker süreçleri birleşik)"""
+    if not settings.metrics_enabled:
+        return JSONResponse(status_code=404, content={"status": "disabled"})
+    if not HAS_PROMETHEUS:
+        # Boş 200 yanıtı scrape'i başarılı gösterirdi
+        return JSONResponse(status_code=503, content={"status": "unavailable", "detail": "prometheus-client kurulu değil"})
+    
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 # ==================== ERROR HANDLERS ====================
 
 @app.exception_handler(Exception)
@@ -2,7 +2,7 @@
 Pydantic modelleri - Request ve Response veri yapıları
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -26,6 +26,7 @@ class ProductResponse(BaseModel):
     ingredients_text: Optional[str] = None
     source: str
     added_date: str
+    ruleset_version: Optional[int] = None  # riski belirleyen kural seti (None: elle/kaynaktan, 0: sınıflandırma bekliyor)
 
 
 class BarcodeResponseSuccess(BaseModel):
@@ -41,6 +42,28 @@ class BarcodeResponseNotFound(BaseModel):
     suggestion: str = "ingredients_analysis"
 
 
+class BulkBarcodeRequest(BaseModel):
+    """Toplu barkod tarama isteği (ör. alışveriş sepeti)"""
+    barcodes: List[str] = Field(..., min_length=1, description="Barkod listesi")
+
+
+class BulkBarcodeResult(BaseModel):
+    """Toplu taramada tek barkodun sonucu"""
+    barcode: str
+    status: str  # "success", "not_found", "invalid"
+    product: Optional[ProductResponse] = None
+    message: Optional[str] = None
+
+
+class BulkBarcodeResponse(BaseModel):
+    """Toplu barkod tarama yanıtı (sonuçlar istek sırasıyla)"""
+    status: str = "success"
+    results: List[BulkBarcodeResult]
+    found: int
+    not_found: int
+    invalid: int
+
+
 # ==================== İçindekiler Analizi ====================
 
 class IngredientAnalysis(BaseModel):
@@ -8,10 +8,15 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from models import BarcodeRequest, BarcodeResponseSuccess, BarcodeResponseNotFound, ErrorResponse
-from db.database import db
+from config import settings
+from models import (
+    BarcodeRequest, BarcodeResponseSuccess, BarcodeResponseNotFound, ErrorResponse,
+    BulkBarcodeRequest, BulkBarcodeResult, BulkBarcodeResponse
+)
+from db.async_database import async_db
+from services.barcode_service import barcode_service
 from utils.validators import validate_barcode
-from utils.helpers import format_product_response, get_risk_emoji
+from utils.helpers import get_risk_emoji
 from utils.logger import logger
 
 
@@ -40,15 +45,15 @@ async def scan_barcode(request: BarcodeRequest):
                 detail=message
             )
         
-        # Veritabanında ara
-        product = db.get_product_by_barcode(request.barcode)
+        # Önbellekte, yoksa veritabanında ara
+        product = await barcode_service.lookup(request.barcode)
         
         if product:
-            logger.info(f"✅ Ürün bulundu: {product['product_name']} ({request.barcode})")
+            logger.info(f"✅ Ürün bulundu: {product.product_name} ({request.barcode})")
             
             return BarcodeResponseSuccess(
                 status="success",
-                product=format_product_response(product)
+                product=product
             )
         else:
             logger.info(f"❌ Ürün bulunamadı: {request.barcode}")
@@ -69,6 +74,71 @@ async def scan_barcode(request: BarcodeRequest):
         )
 
 
+@router.post(
+    "/barcodes",
+    response_model=BulkBarcodeResponse,
+    summary="Toplu barkod sorgu",
+    description="Bir sepetteki tüm barkodları tek istekte sorgular; sonuçlar istek sırasıyla döner"
+)
+async def scan_barcodes(request: BulkBarcodeRequest):
+    """
+    Toplu barkod tarama endpoint'i
+    
+    - **barcodes**: Barkod listesi (en fazla `BULK_SCAN_MAX_BARCODES` adet)
+    
+    Geçersiz barkodlar isteği reddettirmez, `invalid` durumuyla döner.
+    """
+    if len(request.barcodes) > settings.bulk_scan_max_barcodes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tek istekte en fazla {settings.bulk_scan_max_barcodes} barkod sorgulanabilir"
+        )
+    
+    try:
+        validation = {}
+        for barcode in request.barcodes:
+            if barcode not in validation:
+                validation[barcode] = validate_barcode(barcode)
+        
+        valid_barcodes = [barcode for barcode, (is_valid, _) in validation.items() if is_valid]
+        products = await barcode_service.lookup_many(valid_barcodes)
+        
+        results = []
+        found = not_found = invalid = 0
+        for barcode in request.barcodes:
+            is_valid, message = validation[barcode]
+            if not is_valid:
+                invalid += 1
+                results.append(BulkBarcodeResult(barcode=barcode, status="invalid", message=message))
+            elif products.get(barcode):
+                found += 1
+                results.append(BulkBarcodeResult(barcode=barcode, status="success", product=products[barcode]))
+            else:
+                not_found += 1
+                results.append(BulkBarcodeResult(
+                    barcode=barcode,
+                    status="not_found",
+                    message="Ürün veri tabanında bulunamadı"
+                ))
+        
+        logger.info(f"🛒 Toplu tarama: {len(request.barcodes)} barkod, {found} bulundu, {not_found} bulunamadı, {invalid} geçersiz")
+        
+        return BulkBarcodeResponse(
+            status="success",
+            results=results,
+            found=found,
+            not_found=not_found,
+            invalid=invalid
+        )
+    
+    except Exception as e:
+        logger.error(f"Toplu barkod tarama hatası: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Sunucu hatası oluştu"
+        )
+
+
 @router.get(
     "/stats",
     summary="Veritabanı istatistikleri",
@@ -77,11 +147,13 @@ async def scan_barcode(request: BarcodeRequest):
 async def get_barcode_stats():
     """Veritabanı istatistiklerini getir"""
     try:
-        stats = db.get_statistics()
+        stats = await async_db.get_statistics()
         
         return {
             "status": "success",
-            "statistics": stats
+            "statistics": stats,
+            "cache": barcode_service.stats(),
+            "bloom_filter": barcode_service.bloom_stats()
         }
     except Exception as e:
         logger.error(f"İstatistik hatası: {str(e)}", exc_info=True)
@@ -1,22 +1,63 @@
 """
 İçindekiler analizi endpoint'leri
 """
-from fastapi import APIRouter, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Query
+from starlette.concurrency import run_in_threadpool
 from typing import List
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from services.ocr_engine import get_ocr_engine
+from config import settings
+from services.analysis_jobs import job_manager, JobQueueFullError
+from services.ingredient_analysis import analyze_image
+from services.ocr_pool import ocr_pool
 from services.nlp_analyzer import get_nlp_analyzer
+from services.result_cache import image_cache
+from services.ruleset import ruleset_manager
 from utils.logger import logger
+from utils.metrics import observe_stage
 from utils.helpers import get_risk_emoji
+from utils.validators import validate_image_header
 
 
 router = APIRouter(prefix="/api/v1/analyze", tags=["Ingredients Analysis"])
 
 
+async def _read_image(image: UploadFile) -> bytes:
+    """Yüklenen görüntüyü doğrula ve oku
+    
+    Gövde boyutu akış sırasında UploadSizeLimitMiddleware tarafından sınırlanır;
+    Starlette dosyayı 1MB'dan sonra diske taşan geçici dosyada tutar. Dosya
+    türü content_type yerine ilk baytlardan belirlenir.
+    """
+    max_mb = settings.max_upload_size / (1024 * 1024)
+    if image.size is not None and image.size > settings.max_upload_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Dosya {max_mb:.3g}MB'dan küçük olmalıdır"
+        )
+    
+    # Dosya türü kontrolü (magic bytes)
+    is_valid, message = validate_image_header(await image.read(16))
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=message
+        )
+    
+    # Tek okuma: bytes, io.BytesIO'ya kopyalanmadan paylaşılır
+    await image.seek(0)
+    contents = await image.read(settings.max_upload_size + 1)
+    if len(contents) > settings.max_upload_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Dosya {max_mb:.3g}MB'dan küçük olmalıdır"
+        )
+    return contents
+
+
 @router.post(
     "/ingredients",
     summary="İçindekiler OCR + NLP analizi",
@@ -26,117 +67,111 @@ async def analyze_ingredients(image: UploadFile = File(...)):
     """
     İçindekiler analizi endpoint'i (OCR + NLP)
     
-    - **image**: İçindekiler kısmının fotoğrafı (JPG, PNG, max 5MB)
+    - **image**: İçindekiler kısmının fotoğrafı (JPG, PNG, en fazla MAX_UPLOAD_SIZE)
     
     Çalışma sırası:
     1. EasyOCR ile metin tanıması
     2. Malzemelerin çıkarılması
     3. NLP ile gluten risk analizi
+    
+    Aynı fotoğraf tekrar yüklenirse sonuç önbellekten döner (`cached: true`).
     """
     try:
-        # Dosya türü kontrolü
-        if image.content_type not in ["image/jpeg", "image/png", "image/jpg"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Yalnızca JPG ve PNG dosyaları desteklenir"
-            )
-        
-        # Dosya boyutu kontrolü (max 5MB)
-        contents = await image.read()
-        if len(contents) > 5 * 1024 * 1024:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail="Dosya 5MB'dan küçük olmalıdır"
-            )
+        contents = await _read_image(image)
         
         logger.info(f"📸 İçindekiler analizi başlatılıyor: {image.filename}")
         
-        # 1. OCR - Metin tanıması
-        ocr_engine = get_ocr_engine()
-        
-        if not ocr_engine.reader:
-            logger.warning("⚠️  EasyOCR yüklenmedi, mock analiz döndürülüyor")
-            return {
-                "status": "warning",
-                "message": "EasyOCR kurulu değil",
-                "note": "pip install easyocr ile yükleyiniz",
-                "extracted_text": "MOCK: Buğday Unu, Su, Tuz, Şeker",
-                "analysis": {
-                    "detected_ingredients": [
-                        {"ingredient": "Buğday Unu", "risk_level": "dangerous", "confidence": 0.95},
-                    ],
-                    "overall_risk_level": "dangerous",
-                    "gluten_found": True,
-                    "cross_contamination_risk": False,
-                    "confidence_score": 0.95,
-                    "explanation": "Buğday unu gluten içerir",
-                    "recommendations": [
-                        "❌ Bu ürün gluten içermektedir - RISKLI",
-                        "🚫 Çölyak hastası olarak TÜKETMEYİN"
-                    ]
-                }
-            }
-        
-        # OCR ile metin çıkart
-        ocr_result = ocr_engine.extract_text_with_confidence(contents)
-        
-        if not ocr_result or not ocr_result.get("text"):
-            logger.warning("❌ OCR metni çıkaramadı")
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail="Görüntüden metin çıkarılamadı. Daha net bir fotoğraf deneyin."
-            )
-        
-        extracted_text = ocr_result["text"]
-        ocr_confidence = ocr_result["confidence"]
-        
-        logger.info(f"✅ OCR başarılı: {len(extracted_text)} karakter, %{ocr_confidence*100:.1f} güven")
-        
-        # 2. Malzemeleri çıkart
-        ingredients_list = ocr_engine.extract_ingredients_from_text(extracted_text)
-        
-        logger.info(f"📋 {len(ingredients_list)} malzeme bulundu")
-        
-        # 3. NLP - Gluten risk analizi
-        nlp_analyzer = get_nlp_analyzer()
-        
-        if ingredients_list:
-            # Malzeme listesi varsa analiz et
-            analysis_result = nlp_analyzer.analyze_ingredients(ingredients_list)
-        else:
-            # Malzeme listesi yoksa, ham metin üzerinde analiz yap
-            analysis_result = nlp_analyzer.analyze_text(extracted_text)
-        
-        # Risk puanı hesapla
-        risk_score = nlp_analyzer.calculate_risk_score(analysis_result)
+        return await analyze_image(contents)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ İçindekiler analizi hatası: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Analiz yapılamadı"
+        )
+
+
+@router.post(
+    "/jobs",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Asenkron içindekiler analizi",
+    description="Fotoğrafı kuyruğa al, sonucu iş kimliğiyle sorgula"
+)
+async def submit_analysis_job(image: UploadFile = File(...)):
+    """
+    İçindekiler analizini arka planda başlat
+    
+    Bağlantıyı OCR süresince açık tutmak yerine hemen bir iş kimliği döner;
+    sonuç `GET /api/v1/analyze/jobs/{job_id}` ile (isteğe bağlı `wait`
+    parametresiyle long-poll) alınır.
+    """
+    try:
+        contents = await _read_image(image)
+        job_id = await job_manager.submit(contents)
         
-        logger.info(f"🎯 Risk Seviyesi: {analysis_result['risk_level']} (Puan: {risk_score})")
+        logger.info(f"📮 Analiz işi kuyruğa alındı: {job_id} ({image.filename})")
         
-        # Yanıt oluştur
         return {
-            "status": "success",
-            "extracted_text": extracted_text,
-            "ocr_confidence": ocr_confidence,
-            "analysis": {
-                **analysis_result,
-                "risk_score": risk_score
-            },
-            "debug": {
-                "ingredients_extracted": ingredients_list,
-                "ocr_line_count": ocr_result.get("line_count", 0)
-            }
+            "status": "accepted",
+            "job_id": job_id,
+            "status_url": f"{router.prefix}/jobs/{job_id}"
         }
     
+    except JobQueueFullError:
+        logger.warning("⏳ Analiz iş kuyruğu dolu, istek reddedildi")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Sunucu şu anda yoğun. Lütfen biraz sonra tekrar deneyin.",
+            headers={"Retry-After": str(settings.ocr_retry_after)}
+        )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ İçindekiler analizi hatası: {str(e)}", exc_info=True)
+        logger.error(f"❌ Analiz işi oluşturma hatası: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Analiz yapılamadı"
+            detail="Analiz işi oluşturulamadı"
         )
 
 
+@router.get(
+    "/jobs/{job_id}",
+    summary="Analiz işi durumu",
+    description="İşin durumunu ve bittiyse sonucunu getir (wait ile long-poll)"
+)
+async def get_analysis_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="İş bitene kadar en fazla kaç saniye beklensin")
+):
+    """
+    Analiz işi sorgulama
+    
+    - **status**: queued, processing, done, failed
+    - **wait**: 0 ise hemen döner; aksi halde iş bitene ya da süre dolana kadar bekler
+    """
+    try:
+        job = await job_manager.get(job_id, min(wait, settings.analysis_job_max_wait))
+    except Exception as e:
+        logger.error(f"Analiz işi sorgulama hatası: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Analiz işi sorgulanamadı"
+        )
+    
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analiz işi bulunamadı veya saklama süresi doldu"
+        )
+    
+    return {
+        "status": "success",
+        "job": job
+    }
+
+
 @router.post(
     "/text",
     summary="Metin analizi",
@@ -157,8 +192,9 @@ async def analyze_text(text: str):
         
         logger.info(f"📝 Metin analizi: {text[:50]}...")
         
-        nlp_analyzer = get_nlp_analyzer()
-        analysis_result = nlp_analyzer.analyze_text(text)
+        nlp_analyzer = await run_in_threadpool(get_nlp_analyzer)
+        with observe_stage("nlp_classification"):
+            analysis_result = await run_in_threadpool(nlp_analyzer.analyze_text, text)
         risk_score = nlp_analyzer.calculate_risk_score(analysis_result)
         
         return {
@@ -180,6 +216,26 @@ async def analyze_text(text: str):
         )
 
 
+@router.get(
+    "/ruleset",
+    summary="Aktif kural seti",
+    description="NLP analizinde kullanılan gluten kural setinin sürümü ve oluşturulma zamanı"
+)
+async def get_ruleset_info():
+    """Aktif kural seti bilgisi (model yüklemez)"""
+    try:
+        return {
+            "status": "success",
+            "ruleset": ruleset_manager.current.info()
+        }
+    except Exception as e:
+        logger.error(f"Kural seti bilgisi hatası: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Kural seti bilgisi alınamadı"
+        )
+
+
 @router.get(
     "/test",
     summary="Test endpoint",
@@ -187,13 +243,16 @@ async def analyze_text(text: str):
 )
 async def test_endpoint():
     """Basit test endpoint'i"""
-    ocr_engine = get_ocr_engine()
-    nlp_analyzer = get_nlp_analyzer()
+    ocr_ready = await ocr_pool.is_available()
+    nlp_analyzer = await run_in_threadpool(get_nlp_analyzer)
     
     return {
         "status": "success",
         "message": "Analiz API'si çalışıyor ✅",
-        "ocr_ready": ocr_engine.reader is not None,
+        "ocr_ready": ocr_ready,
+        "ocr_pool": ocr_pool.stats(),
+        "image_cache": await run_in_threadpool(image_cache.stats),
+        "analysis_jobs": job_manager.stats(),
         "nlp_ready": nlp_analyzer is not None,
         "test_url": "/api/v1/analyze/text?text=Buğday%20unu"
     }
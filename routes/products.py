@@ -9,7 +9,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from models import ProductCreate, ProductUpdate, ProductSearchResponse
-from db.database import db
+from db.async_database import async_db
 from utils.validators import validate_product_name, validate_barcode
 from utils.helpers import format_product_response
 from utils.logger import logger
@@ -22,7 +22,7 @@ router = APIRouter(prefix="/api/v1/products", tags=["Product Management"])
     "/search",
     response_model=ProductSearchResponse,
     summary="Ürün arama",
-    description="Ürün adı veya marka ile ara"
+    description="Ürün adı, marka veya içindekiler ile ara (Türkçe karakter duyarsız, önek eşleşmeli, alaka sıralı)"
 )
 async def search_products(
     q: str = Query(..., min_length=1, description="Arama metni"),
@@ -31,11 +31,11 @@ async def search_products(
     """
     Ürün arama endpoint'i
     
-    - **q**: Arama metni (ürün adı, marka vb.)
+    - **q**: Arama metni (ürün adı, marka, içindekiler; "cörek" -> "Çörek", "glutensiz ekm" -> "Glutensiz Ekmek")
     - **limit**: Döndürülecek sonuç sayısı (default: 10, max: 100)
     """
     try:
-        results = db.search_products(q, limit)
+        results = await async_db.search_products(q, limit)
         
         formatted_results = [format_product_response(product) for product in results]
         
@@ -109,7 +109,7 @@ async def create_product(product: ProductCreate):
             )
         
         # Ürünü ekle
-        product_id = db.create_product(product.model_dump())
+        product_id = await async_db.create_product(product.model_dump())
         
         logger.info(f"✅ Yeni ürün eklendi: {product.product_name} (ID: {product_id})")
         
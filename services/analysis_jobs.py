@@ -0,0 +1,252 @@
+"""
+Analiz İşleri - görüntü analizini arka planda çalıştıran iş kuyruğu
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Set
+import sys
+
+from fastapi import HTTPException, status
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from db.async_database import AsyncDatabase, async_db
+from services.ingredient_analysis import analyze_image
+from utils.logger import logger
+from utils.timing import collect_spans
+
+
+FINISHED_STATUSES = ("done", "failed")
+
+
+class JobQueueFullError(Exception):
+    """İş kuyruğu dolu ya da kapanıyor - istemci daha sonra tekrar denemeli"""
+
+
+class AnalysisJobManager:
+    """Yüklenen görüntüleri sınırlı bir kuyruktan worker görevleriyle işler
+
+    İş durumu ve sonucu veritabanında tutulur (`analysis_jobs`), böylece
+    birden fazla worker süreci çalışırken sorgu hangi sürece düşerse düşsün
+    yanıtlanır. Görüntü baytları yalnızca işi kabul eden sürecin belleğinde
+    bekler. Biten işler `analysis_job_retention` saniye sonra silinir.
+    """
+
+    def __init__(self, database: AsyncDatabase):
+        self._db = database
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._cleanup_task: Optional[asyncio.Task] = None
+        # Bu süreçte bekleyen işler: long-poll anında uyandırılır
+        self._events: Dict[str, asyncio.Event] = {}
+        # Kaydı yazılırken kuyruktaki yeri ayrılmış işler (eşzamanlı submit'ler için)
+        self._reserved = 0
+        # Worker'larda işlenmekte olan işler: kapanışta yarıda kalanlar başarısız sayılır
+        self._active: Set[str] = set()
+        self.accepting = False
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self):
+        """Worker görevlerini ve temizlik döngüsünü başlat"""
+        self._queue = asyncio.Queue(maxsize=settings.analysis_job_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(settings.analysis_job_workers)
+        ]
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        self.accepting = True
+        logger.info(f"📮 Analiz iş kuyruğu başlatıldı ({settings.analysis_job_workers} worker)")
+
+    async def stop(self):
+        """Yeni iş kabulünü durdur, kuyruktakileri bitir (en fazla drain süresi kadar)"""
+        if self._queue is None:
+            return
+        self.accepting = False
+
+        try:
+            await asyncio.wait_for(self._queue.join(), settings.analysis_job_drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️  {self._queue.qsize()} analiz işi bitirilemeden kapatılıyor")
+
+        for task in [*self._workers, self._cleanup_task]:
+            task.cancel()
+        await asyncio.gather(*self._workers, self._cleanup_task, return_exceptions=True)
+
+        # Bitirilemeyen (işlenirken kesilen ya da kuyrukta kalan) işler
+        # sorgulayan istemciye başarısız olarak görünür
+        unfinished = list(self._active)
+        while not self._queue.empty():
+            job_id, _, _ = self._queue.get_nowait()
+            unfinished.append(job_id)
+        self._active.clear()
+        for job_id in unfinished:
+            await self._finish(job_id, "failed", error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                               error_detail="Sunucu yeniden başlatıldı, lütfen tekrar gönderin")
+
+        self._workers = []
+        self._cleanup_task = None
+        self._queue = None
+
+    async def submit(self, contents: bytes) -> str:
+        """Görüntüyü kuyruğa al ve iş kimliğini döndür"""
+        if not self.accepting or self._queue.qsize() + self._reserved >= self._queue.maxsize:
+            raise JobQueueFullError("Analiz iş kuyruğu dolu")
+
+        # Yer kayıt yazılmadan ayrılır: aynı anda gelen istekler kuyruğu taşıramaz
+        self._reserved += 1
+        try:
+            job_id = uuid.uuid4().hex
+            await self._db.create_analysis_job(job_id)
+        finally:
+            self._reserved -= 1
+
+        if not self.accepting:
+            # Kayıt yazılırken kapanış başladı: iş kuyruğa girmez
+            await self._finish(job_id, "failed", error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                               error_detail="Sunucu yeniden başlatılıyor, lütfen tekrar gönderin")
+            raise JobQueueFullError("Analiz iş kuyruğu kapanıyor")
+
+        self._events[job_id] = asyncio.Event()
+        self._queue.put_nowait((job_id, contents, time.monotonic()))
+        return job_id
+
+    async def get(self, job_id: str, wait: float = 0) -> Optional[Dict[str, Any]]:
+        """
+        İşi getir; wait > 0 ise iş bitene kadar en fazla wait saniye bekle
+
+        Returns:
+            format_job() çıktısı veya None (iş yok ya da süresi dolmuş)
+        """
+        job = await self._db.get_analysis_job(job_id)
+        if job is None or job["status"] in FINISHED_STATUSES or wait <= 0:
+            return format_job(job)
+
+        event = self._events.get(job_id)
+        if event is not None:
+            # İş bu süreçte: bitince anında uyan
+            try:
+                await asyncio.wait_for(event.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            # İş başka bir worker sürecinde: veritabanını yokla
+            deadline = time.monotonic() + wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(min(settings.analysis_job_poll_interval, deadline - time.monotonic()))
+                job = await self._db.get_analysis_job(job_id)
+                if job is None or job["status"] in FINISHED_STATUSES:
+                    return format_job(job)
+
+        return format_job(await self._db.get_analysis_job(job_id))
+
+    async def _worker(self):
+        while True:
+            job_id, contents, submitted_at = await self._queue.get()
+            self._active.add(job_id)
+            try:
+                await self._process(job_id, contents, submitted_at + settings.analysis_job_timeout)
+            except Exception as e:
+                logger.error(f"❌ Analiz işi {job_id} kaydedilemedi: {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+            # İptal edilen (kapanışta kesilen) iş burada çıkarılmaz; stop() başarısız yazar
+            self._active.discard(job_id)
+
+    async def _process(self, job_id: str, contents: bytes, deadline: float):
+        await self._db.update_analysis_job(job_id, "processing")
+
+        while True:
+            try:
+                # İşin kendi zamanlaması (server_timing_debug ile sonuçtaki debug bloğunda)
+                with collect_spans():
+                    result = await analyze_image(contents)
+            except HTTPException as e:
+                if (e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+                        and time.monotonic() + settings.ocr_retry_after < deadline):
+                    # OCR havuzu dolu: iş zaten kuyrukta bekleyebilir, biraz sonra tekrar dene
+                    await asyncio.sleep(settings.ocr_retry_after)
+                    continue
+                if e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+                    logger.warning(f"⚠️  Analiz işi {job_id} OCR kapasitesi beklenirken zaman aşımına uğradı")
+                    await self._finish(job_id, "failed", error_code=e.status_code,
+                                       error_detail="OCR servisi meşgul, iş zaman aşımına uğradı")
+                    return
+                await self._finish(job_id, "failed", error_code=e.status_code, error_detail=e.detail)
+                return
+            except Exception as e:
+                logger.error(f"❌ Analiz işi {job_id} hatası: {str(e)}", exc_info=True)
+                await self._finish(job_id, "failed", error_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                   error_detail="Analiz yapılamadı")
+                return
+            break
+
+        await self._finish(job_id, "done", result=result)
+
+    async def _finish(self, job_id: str, job_status: str, result: Optional[Dict[str, Any]] = None,
+                      error_code: Optional[int] = None, error_detail: Optional[str] = None):
+        # Sonuç yazılırken gelen iptal durumu stop()'ta ezmesin
+        self._active.discard(job_id)
+        try:
+            await self._db.update_analysis_job(job_id, job_status, result, error_code, error_detail)
+        finally:
+            if job_status == "done":
+                self.completed += 1
+            else:
+                self.failed += 1
+            event = self._events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    async def _cleanup_loop(self):
+        interval = min(settings.analysis_job_retention, 60.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self._db.purge_analysis_jobs(time.time() - settings.analysis_job_retention)
+                if removed:
+                    logger.debug(f"🧹 {removed} eski analiz işi silindi")
+            except Exception as e:
+                logger.warning(f"⚠️  Eski analiz işleri silinemedi: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "accepting": self.accepting,
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": settings.analysis_job_queue_size,
+            "pending": len(self._events),
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def format_job(job: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Veritabanı kaydını API yanıtına dönüştür"""
+    if job is None:
+        return None
+
+    formatted = {
+        "id": job["id"],
+        "status": job["status"],
+        "created_at": _isoformat(job["created_at"]),
+        "updated_at": _isoformat(job["updated_at"]),
+        "expires_at": _isoformat(job["updated_at"] + settings.analysis_job_retention)
+    }
+    if job["status"] == "done":
+        formatted["result"] = job["result"]
+    elif job["status"] == "failed":
+        formatted["error"] = {"code": job["error_code"], "detail": job["error_detail"]}
+    return formatted
+
+
+# Global analysis job manager instance
+job_manager = AnalysisJobManager(async_db)
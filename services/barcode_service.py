@@ -0,0 +1,330 @@
+"""
+Barkod Servisi - önbellekli ürün sorgusu
+"""
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+import sys
+
+from starlette.concurrency import run_in_threadpool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from models import ProductResponse
+from db.database import Database, db
+from db.async_database import AsyncDatabase, async_db
+from utils.bloom import BloomFilter
+from utils.cache import LRUCache, MISSING
+from utils.helpers import format_product_response
+from utils.logger import logger
+
+
+class BarcodeService:
+    """Barkod sorgularını LRU/TTL önbellek üzerinden yanıtlar
+
+    Hem bulunan ürünler (formatlanmış ProductResponse) hem de bulunamayan
+    barkodlar (None) önbelleğe alınır. Database üzerinden yapılan her
+    ekleme/güncelleme/silme ilgili barkodu önbellekten düşürür.
+
+    Önbellekte olmayan barkodlar önce tüm bilinen barkodların Bloom
+    filtresine sorulur; filtre "kesinlikle yok" derse veritabanına gidilmez.
+    Diğer süreçlerin (worker'lar, içe aktarma, sınıflandırma) eklemeleri
+    trigger'larla artan `barcode_version` sayacından anlaşılır: sayaç
+    ilerlediyse filtreye yalnızca son görülen id'den sonraki ürünler
+    eklenir. Barkodu değiştirilen ürünler id'den anlaşılamadığından bu
+    durumda filtre yeniden kurulana kadar atlanır ve sorgular veritabanına
+    gider. Silinen barkodlar (zararsız yanlış pozitifler) periyodik yeniden
+    oluşturmada temizlenir.
+    """
+
+    def __init__(self, database: Database, async_database: AsyncDatabase):
+        self._db = database
+        self._async_db = async_database
+        self.cache = LRUCache(
+            maxsize=settings.barcode_cache_size,
+            ttl=settings.barcode_cache_ttl,
+            name="barcode"
+        )
+        self.bloom: Optional[BloomFilter] = None
+        self._building_bloom: Optional[BloomFilter] = None
+        self._bloom_built_at: Optional[float] = None
+        # Filtrenin yansıttığı durum: (sürüm, barkod değişikliği sayacı) ve en büyük ürün id'si
+        self._bloom_version: Optional[Tuple[int, int]] = None
+        self._bloom_max_id = 0
+        self._known_version: Optional[Tuple[int, int]] = None
+        self._version_checked_at = 0.0
+        # Yeniden oluşturma ve artımlı güncelleme aynı anda çalışmaz
+        self._sync_lock = threading.Lock()
+        self._bloom_task: Optional[asyncio.Task] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self.bloom_negatives = 0
+        self.bloom_false_positives = 0
+        database.add_product_listener(self._on_product_change)
+
+    def _on_product_change(self, event: str, barcode: str):
+        self.cache.invalidate(barcode)
+        if event != "delete":
+            for bloom in (self.bloom, self._building_bloom):
+                if bloom is not None:
+                    bloom.add(barcode)
+
+    # ==================== BLOOM FİLTRESİ ====================
+
+    def rebuild_bloom_filter(self) -> BloomFilter:
+        """Filtreyi products tablosundan yeniden oluştur ve atomik olarak değiştir"""
+        with self._sync_lock:
+            started = time.perf_counter()
+            # Sürüm taramadan önce okunur: tarama sırasındaki eklemeler en kötü
+            # ihtimalle filtreye iki kez eklenir, kaçırılmaz
+            version = self._db.get_barcode_version()
+            count = self._db.count_products()
+            bloom = BloomFilter(
+                capacity=max(settings.barcode_bloom_capacity, int(count * 1.5), 1),
+                error_rate=settings.barcode_bloom_error_rate
+            )
+            # Oluşturma sırasında gelen eklemeler de yeni filtreye yazılır
+            self._building_bloom = bloom
+            max_id = 0
+            try:
+                for product_id, barcode in self._db.iter_barcodes():
+                    bloom.add(barcode)
+                    max_id = product_id
+                self.bloom = bloom
+                self._bloom_version = version
+                self._bloom_max_id = max_id
+                if self._known_version is None:
+                    self._known_version = version
+                self._bloom_built_at = time.time()
+            finally:
+                self._building_bloom = None
+
+        logger.info(
+            f"🌸 Barkod Bloom filtresi hazır: {bloom.items} barkod, "
+            f"{bloom.memory_bytes / 1024:.0f} KB ({(time.perf_counter() - started) * 1000:.0f} ms)"
+        )
+        return bloom
+
+    async def start(self):
+        """Filtreyi oluştur ve periyodik yenilemeyi başlat"""
+        if not settings.barcode_bloom_enabled:
+            return
+
+        await self.refresh_bloom_filter()
+        if settings.barcode_bloom_refresh_interval > 0:
+            self._bloom_task = asyncio.create_task(self._refresh_loop())
+
+    def sync_bloom_filter(self) -> bool:
+        """
+        Başka süreçlerde eklenen ürünleri filtreye ekle (id sırasıyla, artımlı)
+
+        Returns:
+            False: barkod değişikliği var ya da filtre yeniden oluşturuluyor;
+            filtre yeniden kurulana kadar kullanılmamalı
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return False
+        try:
+            bloom = self.bloom
+            if bloom is None:
+                return False
+            # Sürüm taramadan önce okunur (bkz. rebuild_bloom_filter); ürün id'leri
+            # AUTOINCREMENT ve yazmalar seri olduğundan id sırası commit sırasıdır
+            version, renamed = self._db.get_barcode_version()
+            if renamed != self._bloom_version[1]:
+                return False
+
+            added = 0
+            for product_id, barcode in self._db.iter_barcodes(after_id=self._bloom_max_id):
+                bloom.add(barcode)
+                self._bloom_max_id = product_id
+                added += 1
+            self._bloom_version = (version, renamed)
+            if added:
+                logger.debug(f"🌸 Bloom filtresine {added} yeni barkod eklendi")
+            return True
+        finally:
+            self._sync_lock.release()
+
+    async def stop(self):
+        if self._bloom_task is not None:
+            self._bloom_task.cancel()
+            try:
+                await self._bloom_task
+            except asyncio.CancelledError:
+                pass
+            self._bloom_task = None
+        for task in (self._rebuild_task, self._sync_task):
+            if task is not None:
+                task.cancel()
+        self._rebuild_task = None
+        self._sync_task = None
+
+    def _schedule_rebuild(self) -> asyncio.Task:
+        """Filtreyi arka planda yeniden oluştur; süren bir oluşturma varsa onu döndür"""
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.create_task(run_in_threadpool(self.rebuild_bloom_filter))
+            self._rebuild_task.add_done_callback(self._on_rebuild_done)
+        return self._rebuild_task
+
+    @staticmethod
+    def _on_rebuild_done(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"⚠️  Bloom filtresi yenilenemedi: {str(task.exception())}")
+
+    async def refresh_bloom_filter(self):
+        """Filtreyi yeniden oluştur ve bitmesini bekle"""
+        await asyncio.shield(self._schedule_rebuild())
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.barcode_bloom_refresh_interval)
+            try:
+                await self.refresh_bloom_filter()
+            except Exception:
+                pass  # _on_rebuild_done logladı
+
+    def _is_current(self) -> bool:
+        known, built = self._known_version, self._bloom_version
+        return known is not None and built is not None and known[0] <= built[0] and known[1] == built[1]
+
+    async def _current_bloom(self) -> Optional[BloomFilter]:
+        """Güncel filtre; barkod değiştiyse yeniden kurulana kadar None"""
+        bloom = self.bloom
+        if bloom is None:
+            return None
+
+        now = time.monotonic()
+        if now - self._version_checked_at >= settings.barcode_bloom_version_check_interval:
+            self._version_checked_at = now
+            try:
+                self._known_version = await self._async_db.get_barcode_version()
+            except Exception as e:
+                logger.warning(f"⚠️  Barkod sürümü okunamadı: {str(e)}")
+                return None
+
+        if self._is_current():
+            return bloom
+
+        # Eş zamanlı sorgular aynı artımlı güncellemeyi bekler
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(run_in_threadpool(self.sync_bloom_filter))
+        try:
+            synced = await asyncio.shield(self._sync_task)
+        except Exception as e:
+            logger.warning(f"⚠️  Bloom filtresi güncellenemedi: {str(e)}")
+            return None
+
+        if not synced:
+            self._schedule_rebuild()
+            return None
+        bloom = self.bloom
+        if bloom.items > bloom.capacity:
+            # Kapasite aşıldı: yanlış pozitif oranı artmasın diye büyütülür, filtre kullanılmaya devam eder
+            self._schedule_rebuild()
+        return bloom
+
+    # ==================== SORGU ====================
+
+    async def lookup(self, barcode: str) -> Optional[ProductResponse]:
+        """Barkod ile ürün getir (önbellek -> Bloom filtresi -> veritabanı)"""
+        cached = self.cache.get(barcode)
+        if cached is not MISSING:
+            return cached
+
+        bloom = await self._current_bloom()
+        if bloom is not None and barcode not in bloom:
+            self.bloom_negatives += 1
+            return None
+
+        generation = self.cache.generation
+        product = await self._async_db.get_product_by_barcode(barcode)
+
+        if product:
+            response = ProductResponse(**format_product_response(product))
+            self.cache.set(barcode, response, generation=generation)
+        else:
+            if bloom is not None:
+                self.bloom_false_positives += 1
+            response = None
+            self.cache.set(
+                barcode, None,
+                ttl=settings.barcode_cache_not_found_ttl,
+                generation=generation
+            )
+        return response
+
+    async def lookup_many(self, barcodes: List[str]) -> Dict[str, Optional[ProductResponse]]:
+        """Birden çok barkodu getir; önbellekte/filtrede çözülemeyenler tek sorguda"""
+        results: Dict[str, Optional[ProductResponse]] = {}
+        pending = []
+
+        for barcode in dict.fromkeys(barcodes):
+            cached = self.cache.get(barcode)
+            if cached is not MISSING:
+                results[barcode] = cached
+            else:
+                pending.append(barcode)
+
+        bloom = await self._current_bloom() if pending else None
+        if bloom is not None:
+            misses = [barcode for barcode in pending if barcode not in bloom]
+            self.bloom_negatives += len(misses)
+            results.update(dict.fromkeys(misses))
+            pending = [barcode for barcode in pending if barcode in bloom]
+
+        if not pending:
+            return results
+
+        generation = self.cache.generation
+        products = await self._async_db.get_products_by_barcodes(pending)
+
+        for barcode in pending:
+            product = products.get(barcode)
+            if product:
+                response = ProductResponse(**format_product_response(product))
+                self.cache.set(barcode, response, generation=generation)
+            else:
+                if bloom is not None:
+                    self.bloom_false_positives += 1
+                response = None
+                self.cache.set(
+                    barcode, None,
+                    ttl=settings.barcode_cache_not_found_ttl,
+                    generation=generation
+                )
+            results[barcode] = response
+
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Önbellek sayaçları"""
+        return self.cache.stats()
+
+    def bloom_stats(self) -> Optional[Dict[str, Any]]:
+        """Bloom filtresi boyutu, doluluğu ve yanlış pozitif oranları"""
+        bloom = self.bloom
+        if bloom is None:
+            return None
+
+        # Filtrenin "olabilir" dediği ama veritabanında olmayan sorguların oranı
+        absent_lookups = self.bloom_negatives + self.bloom_false_positives
+        return {
+            **bloom.stats(),
+            "built_at": self._bloom_built_at,
+            "version": self._bloom_version[0] if self._bloom_version else None,
+            "max_product_id": self._bloom_max_id,
+            "stale": not self._is_current(),
+            "negatives": self.bloom_negatives,
+            "false_positives": self.bloom_false_positives,
+            "observed_false_positive_rate": (
+                round(self.bloom_false_positives / absent_lookups, 6) if absent_lookups else 0.0
+            )
+        }
+
+
+# Global barcode service instance
+barcode_service = BarcodeService(db, async_db)
@@ -0,0 +1,199 @@
+"""
+Çevrimdışı katalog sınıflandırma - içindekiler metninden risk alanlarını türet
+
+Ürünler id sırasıyla parçalar halinde okunur ve süreç havuzunda
+`NLPAnalyzer` kural motoruyla (zero-shot modeli yüklenmeden) analiz edilir;
+sonuçlar parça başına tek işlemde geri yazılır. Her karar onu üreten kural
+setinin sürümüyle (`products.ruleset_version`) saklanır.
+
+Yalnızca kural motoruna bırakılan ürünler sınıflandırılır:
+`ruleset_version = 0` (içe aktarmada risk bilgisi yoktu) ya da
+`reclassify=True` ile sürümü güncel kural setinden farklı olanlar. Elle
+ya da kaynaktan gelen kararlar (`ruleset_version IS NULL`) değiştirilmez.
+"""
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from db.database import db
+from services.ruleset import Ruleset, StaticRulesets
+from utils.logger import logger
+
+
+# ==================== WORKER SÜREÇLERİ ====================
+
+_worker_analyzer = None
+
+
+def _init_worker(version: int, dangerous: List[str], risky: List[str], quiet: bool = True):
+    """Her worker kural setini bir kez derler"""
+    global _worker_analyzer
+    from services.nlp_analyzer import NLPAnalyzer
+
+    if quiet:
+        logger.remove()  # worker başına tekrarlanan başlangıç logları
+    rulesets = StaticRulesets(Ruleset(version, dangerous, risky))
+    _worker_analyzer = NLPAnalyzer(rulesets=rulesets, database=None, load_model=False)
+
+
+def _classify_chunk(rows: List[Tuple[int, str]]) -> List[tuple]:
+    """[(id, içindekiler)] -> UPDATE parametreleri"""
+    version = _worker_analyzer.ruleset.version
+    updates = []
+    for product_id, ingredients_text in rows:
+        result = _worker_analyzer.analyze_text(ingredients_text)
+        risk_level = result["risk_level"]
+        if risk_level not in ("safe", "risky", "dangerous"):
+            continue  # analiz hatası: ürün beklemede kalır
+        updates.append((
+            risk_level,
+            result["gluten_found"],
+            result["cross_contamination_risk"],
+            version,
+            product_id,
+        ))
+    return updates
+
+
+# ==================== SINIFLANDIRMA ====================
+
+UPDATE_SQL = """
+UPDATE products
+SET risk_level = ?, contains_gluten = ?, contains_cross_contamination = ?,
+    ruleset_version = ?, updated_date = CURRENT_TIMESTAMP
+WHERE id = ? AND ruleset_version IS NOT NULL
+"""
+
+
+def classify_catalog(reclassify: bool = False, workers: Optional[int] = None,
+                     chunk_size: int = 5_000, progress: bool = True) -> Dict[str, Any]:
+    """
+    Bekleyen (veya reclassify ile eskimiş) ürünleri sınıflandır
+
+    Args:
+        reclassify: kural seti değiştiyse eski sürümle verilmiş kararları da yenile
+        workers: süreç sayısı (varsayılan: CPU sayısı; 1 = süreç havuzu yok)
+        chunk_size: worker'a tek seferde giden ürün sayısı
+
+    Returns:
+        {"classified", "skipped", "ruleset_version", "seconds", "rows_per_second", ...}
+    """
+    snapshot = db.get_ruleset_snapshot()
+    version = snapshot["version"]
+    workers = workers or os.cpu_count() or 1
+
+    condition = "ruleset_version IS NOT NULL AND ruleset_version != ?" if reclassify else "ruleset_version = 0"
+    params = (version,) if reclassify else ()
+    # İçindekiler metni olmayan ürünler kural motoruyla değerlendirilemez, beklemede kalır
+    select_sql = f"""
+    SELECT id, ingredients_text FROM products
+    WHERE {condition} AND coalesce(ingredients_text, '') != '' AND id > ?
+    ORDER BY id LIMIT ?
+    """
+
+    reader = sqlite3.connect(settings.database_path)
+    writer = sqlite3.connect(settings.database_path, isolation_level=None)
+    for conn in (reader, writer):
+        conn.execute(f"PRAGMA busy_timeout = {settings.db_busy_timeout}")
+
+    stats = {"classified": 0, "skipped": 0, "ruleset_version": version, "workers": workers}
+    counts = {"safe": 0, "risky": 0, "dangerous": 0}
+    started = time.perf_counter()
+    last_report = started
+    last_id = 0
+
+    def next_chunk():
+        nonlocal last_id
+        rows = reader.execute(select_sql, params + (last_id, chunk_size)).fetchall()
+        if rows:
+            last_id = rows[-1][0]
+        return rows
+
+    def write(updates: List[tuple], submitted: int):
+        nonlocal last_report
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            writer.executemany(UPDATE_SQL, updates)
+            writer.execute("COMMIT")
+        except BaseException:
+            writer.execute("ROLLBACK")
+            raise
+        stats["classified"] += len(updates)
+        stats["skipped"] += submitted - len(updates)
+        for update in updates:
+            counts[update[0]] += 1
+
+        now = time.perf_counter()
+        if progress and now - last_report >= 5:
+            rate = stats["classified"] / (now - started)
+            print(f"   ⏳ {stats['classified']:,} ürün sınıflandırıldı ({rate:,.0f} ürün/sn)")
+            last_report = now
+
+    try:
+        if workers == 1:
+            _init_worker(version, snapshot["dangerous"], snapshot["risky"], quiet=False)
+            while rows := next_chunk():
+                write(_classify_chunk(rows), len(rows))
+        else:
+            # OCR havuzundaki gibi spawn: üst süreçteki bağlantılar ve thread'ler miras alınmaz
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(version, snapshot["dangerous"], snapshot["risky"]),
+            ) as executor:
+                # Bellekte en fazla workers * 2 parça: tablo tamamen okunmaz
+                in_flight = {}
+                exhausted = False
+                while True:
+                    while not exhausted and len(in_flight) < workers * 2:
+                        rows = next_chunk()
+                        if not rows:
+                            exhausted = True
+                            break
+                        in_flight[executor.submit(_classify_chunk, rows)] = len(rows)
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write(future.result(), in_flight.pop(future))
+
+        stats["without_ingredients"] = reader.execute(
+            f"SELECT COUNT(*) FROM products WHERE {condition} AND coalesce(ingredients_text, '') = ''",
+            params
+        ).fetchone()[0]
+    finally:
+        reader.close()
+        writer.close()
+
+    seconds = time.perf_counter() - started
+    stats.update({
+        "counts": counts,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(stats["classified"] / seconds, 1) if seconds > 0 else 0.0,
+    })
+    logger.info(
+        f"🏷️  {stats['classified']} ürün kural seti v{version} ile sınıflandırıldı "
+        f"({stats['rows_per_second']:.0f} ürün/sn, {workers} süreç)"
+    )
+    return stats
+
+
+def print_report(stats: Dict[str, Any]):
+    counts = stats["counts"]
+    print(
+        f"🏷️  Sınıflandırılan: {stats['classified']:,} (kural seti v{stats['ruleset_version']}, "
+        f"{stats['workers']} süreç)"
+    )
+    print(f"   🟢 {counts['safe']:,}  🟡 {counts['risky']:,}  🔴 {counts['dangerous']:,}")
+    if stats["without_ingredients"]:
+        print(f"⏸️  İçindekiler metni olmadığı için beklemede: {stats['without_ingredients']:,}")
+    print(f"⏱️  {stats['seconds']:.1f} sn - {stats['rows_per_second']:,.0f} ürün/sn")
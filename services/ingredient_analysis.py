@@ -0,0 +1,154 @@
+"""
+İçindekiler Analizi - görüntüden OCR + NLP hattı (önbellekli)
+"""
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from services.ocr_engine import OCREngine
+from services.ocr_pool import ocr_pool, OCRQueueFullError
+from services.nlp_analyzer import get_nlp_analyzer
+from services.result_cache import image_cache
+from services.ruleset import ruleset_manager
+from utils.logger import logger
+from utils.metrics import observe_stage
+from utils.timing import current_spans, span
+
+
+# EasyOCR yoksa döndürülen örnek yanıt
+MOCK_RESPONSE = {
+    "status": "warning",
+    "message": "EasyOCR kurulu değil",
+    "note": "pip install easyocr ile yükleyiniz",
+    "extracted_text": "MOCK: Buğday Unu, Su, Tuz, Şeker",
+    "analysis": {
+        "detected_ingredients": [
+            {"ingredient": "Buğday Unu", "risk_level": "dangerous", "confidence": 0.95},
+        ],
+        "overall_risk_level": "dangerous",
+        "gluten_found": True,
+        "cross_contamination_risk": False,
+        "confidence_score": 0.95,
+        "explanation": "Buğday unu gluten içerir",
+        "recommendations": [
+            "❌ Bu ürün gluten içermektedir - RISKLI",
+            "🚫 Çölyak hastası olarak TÜKETMEYİN"
+        ]
+    }
+}
+
+
+async def analyze_image(contents: bytes) -> Dict[str, Any]:
+    """
+    Etiket fotoğrafını analiz et
+
+    Aynı görüntü daha önce işlendiyse sonuç önbellekten döner. Kural seti
+    o zamandan beri değiştiyse yalnızca OCR sonucu yeniden kullanılır, NLP
+    güncel kurallarla tekrar çalışır.
+
+    Raises:
+        HTTPException: 503 (OCR kuyruğu dolu), 422 (metin çıkarılamadı)
+    """
+    fingerprint = None
+    cached = None
+    if settings.image_cache_enabled:
+        with span("image_cache"):
+            fingerprint = await run_in_threadpool(image_cache.fingerprint, contents)
+            cached = await run_in_threadpool(image_cache.get, fingerprint)
+
+    if cached is not None:
+        if cached["response"] and cached["ruleset_version"] == ruleset_manager.current.version:
+            logger.info(f"⚡ Görüntü önbellekten döndü ({cached['match']})")
+            return _with_timings({**cached["response"], "cached": True})
+        ocr_result = cached["ocr_result"]
+        logger.info("♻️  OCR sonucu önbellekten, analiz yeni kural setiyle tekrarlanıyor")
+    else:
+        # 1. OCR - Metin tanıması (süreç havuzunda)
+        if not await ocr_pool.is_available():
+            logger.warning("⚠️  EasyOCR yüklenmedi, mock analiz döndürülüyor")
+            return MOCK_RESPONSE
+
+        try:
+            ocr_result = await ocr_pool.extract_text_with_confidence(contents)
+        except OCRQueueFullError:
+            logger.warning("⏳ OCR kuyruğu dolu, istek reddedildi")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Sunucu şu anda yoğun. Lütfen biraz sonra tekrar deneyin.",
+                headers={"Retry-After": str(settings.ocr_retry_after)}
+            )
+
+    if not ocr_result or not ocr_result.get("text"):
+        logger.warning("❌ OCR metni çıkaramadı")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Görüntüden metin çıkarılamadı. Daha net bir fotoğraf deneyin."
+        )
+
+    response = await analyze_ocr_result(ocr_result)
+
+    if fingerprint is not None:
+        await run_in_threadpool(
+            image_cache.put, fingerprint, ocr_result, response,
+            response["analysis"].get("ruleset_version")
+        )
+
+    return _with_timings({**response, "cached": False})
+
+
+def _with_timings(response: Dict[str, Any]) -> Dict[str, Any]:
+    """server_timing_debug açıksa aşama sürelerini (ms) debug bloğuna ekle"""
+    if not settings.server_timing_debug:
+        return response
+    # Önbellekteki yanıt paylaşılmasın diye debug bloğu kopyalanır
+    return {**response, "debug": {**response.get("debug", {}), "timings": current_spans()}}
+
+
+async def analyze_ocr_result(ocr_result: Dict[str, Any]) -> Dict[str, Any]:
+    """OCR çıktısından malzemeleri çıkar ve gluten risk analizi yap"""
+    extracted_text = ocr_result["text"]
+    ocr_confidence = ocr_result["confidence"]
+
+    logger.info(f"✅ OCR başarılı: {len(extracted_text)} karakter, %{ocr_confidence*100:.1f} güven")
+
+    # 2. Malzemeleri çıkart
+    with observe_stage("ingredient_extraction"):
+        ingredients_list = OCREngine.extract_ingredients_from_text(extracted_text)
+
+    logger.info(f"📋 {len(ingredients_list)} malzeme bulundu")
+
+    # 3. NLP - Gluten risk analizi
+    # (model çıkarımı ve önbellek sorguları event loop dışında çalışır)
+    nlp_analyzer = await run_in_threadpool(get_nlp_analyzer)
+
+    with observe_stage("nlp_classification"):
+        if ingredients_list:
+            # Malzeme listesi varsa analiz et
+            analysis_result = await run_in_threadpool(nlp_analyzer.analyze_ingredients, ingredients_list)
+        else:
+            # Malzeme listesi yoksa, ham metin üzerinde analiz yap
+            analysis_result = await run_in_threadpool(nlp_analyzer.analyze_text, extracted_text)
+
+    # Risk puanı hesapla
+    risk_score = nlp_analyzer.calculate_risk_score(analysis_result)
+
+    logger.info(f"🎯 Risk Seviyesi: {analysis_result['risk_level']} (Puan: {risk_score})")
+
+    return {
+        "status": "success",
+        "extracted_text": extracted_text,
+        "ocr_confidence": ocr_confidence,
+        "analysis": {
+            **analysis_result,
+            "risk_score": risk_score
+        },
+        "debug": {
+            "ingredients_extracted": ingredients_list,
+            "ocr_line_count": ocr_result.get("line_count", 0)
+        }
+    }
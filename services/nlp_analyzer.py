@@ -3,47 +3,165 @@ NLP Analyzer - Gluten risk analizi
 """
 from typing import Dict, List, Any, Tuple
 from pathlib import Path
+import importlib.util
 import sys
 import re
+import threading
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from db.database import db
+from config import settings
+from db.database import Database, db
+from services.ruleset import Ruleset, RulesetManager, ruleset_manager
+from utils.cache import LRUCache, MISSING
+from utils.helpers import turkish_casefold
 from utils.logger import logger
+from utils.timing import span
 
-try:
-    from transformers import pipeline
-    HAS_TRANSFORMERS = True
-except ImportError:
-    HAS_TRANSFORMERS = False
+# transformers (ve torch) yalnızca analyzer oluşturulurken import edilir;
+# barkod odaklı worker'lar bu maliyeti hiç ödemez
+HAS_TRANSFORMERS = importlib.util.find_spec("transformers") is not None
+
+
+# Zero-shot sınıflandırma etiketleri
+GLUTEN_LABELS = ["contains gluten", "gluten-free", "uncertain"]
+
+
+def normalize_ingredient(ingredient: str) -> str:
+    """Sınıflandırma önbelleği anahtarı: Türkçe küçük harf, tek boşluk, kenar noktalamasız"""
+    return " ".join(turkish_casefold(ingredient).split()).strip(" .,;:-*()")
 
 
 class NLPAnalyzer:
     """NLP ile gluten risk analizi"""
     
-    def __init__(self):
-        """NLP Analyzer'ı başlat"""
-        self.dangerous_ingredients = db.get_dangerous_ingredients()
-        self.risky_keywords = db.get_risky_keywords()
+    def __init__(self, rulesets: RulesetManager = ruleset_manager, database: Database = db,
+                 load_model: bool = True):
+        """NLP Analyzer'ı başlat (load_model=False: yalnızca kural motoru)"""
+        self.rulesets = rulesets
+        self.db = database
+        self.model_name = settings.nlp_model
         self.classifier = None
+        # normalize edilmiş malzeme -> (en yüksek etiket, skor)
+        self.label_cache = LRUCache(maxsize=settings.nlp_label_cache_size, name="nlp_labels")
         
-        logger.info(f"📊 NLP Analyzer başlatıldı")
-        logger.info(f"   ⚠️  Tehlikeli malzeme: {len(self.dangerous_ingredients)}")
-        logger.info(f"   🟡 Riskli kelime: {len(self.risky_keywords)}")
+        ruleset = self.ruleset
+        logger.info(f"📊 NLP Analyzer başlatıldı (kural seti v{ruleset.version})")
+        logger.info(f"   ⚠️  Tehlikeli malzeme: {len(ruleset.dangerous_ingredients)}")
+        logger.info(f"   🟡 Riskli kelime: {len(ruleset.risky_keywords)}")
         
         # Transformers yükle (opsiyonel)
-        if HAS_TRANSFORMERS:
+        if HAS_TRANSFORMERS and load_model:
             try:
                 logger.debug("🤖 Hugging Face model yükleniyor...")
+                from transformers import pipeline
+                
                 # Zero-shot classification modeli
                 self.classifier = pipeline(
                     "zero-shot-classification",
-                    model="distilbert-base-multilingual-cased"
+                    model=self.model_name
                 )
                 logger.info("✅ NLP model hazır")
             except Exception as e:
                 logger.warning(f"⚠️  NLP model yüklenemedi: {str(e)}")
                 self.classifier = None
+        
+        if self.classifier:
+            self._purge_stale_classifications()
+    
+    def _purge_stale_classifications(self):
+        """Model değiştiyse eski modelin kalıcı sonuçlarını temizle"""
+        try:
+            purged = self.db.purge_ingredient_classifications(self.model_name)
+            if purged:
+                logger.info(f"🧹 {purged} eski model sınıflandırması silindi")
+        except Exception as e:
+            logger.warning(f"⚠️  Sınıflandırma önbelleği temizlenemedi: {str(e)}")
+    
+    @property
+    def ruleset(self) -> Ruleset:
+        """Aktif kural seti (arka planda yenilenir, model yeniden yüklenmez)"""
+        return self.rulesets.current
+    
+    @property
+    def dangerous_ingredients(self) -> List[str]:
+        return self.ruleset.dangerous_ingredients
+    
+    @property
+    def risky_keywords(self) -> List[str]:
+        return self.ruleset.risky_keywords
+    
+    def find_matches(self, text: str) -> List[Dict[str, Any]]:
+        """Metindeki tüm tehlikeli/riskli anahtar kelimeleri bul (bkz. Ruleset.find_matches)"""
+        return self.ruleset.find_matches(text)
+    
+    def warmup(self):
+        """Örnek bir çıkarım yaparak model ve otomatı ısıt (sonuç kaydedilmez)"""
+        self.find_matches("İçindekiler: buğday unu, su, tuz")
+        if self.classifier:
+            self.classifier(["buğday unu", "su"], GLUTEN_LABELS, multi_label=False)
+    
+    def classify_ingredients(self, ingredients: List[str]) -> Dict[str, Tuple[str, float]]:
+        """
+        Malzemeleri zero-shot modelle toplu sınıflandır
+        
+        Sıra: bellek içi LRU -> kalıcı ingredient_classifications tablosu ->
+        model. Modelden geçenler tek bir batch'li pipeline çağrısıyla
+        sınıflandırılır ve tabloya toplu yazılır.
+        
+        Returns:
+            {normalize_ingredient(malzeme): (en yüksek etiket, skor)}
+        """
+        results: Dict[str, Tuple[str, float]] = {}
+        missing = []
+        
+        for key in dict.fromkeys(normalize_ingredient(i) for i in ingredients):
+            if not key:
+                continue
+            cached = self.label_cache.get(key)
+            if cached is MISSING:
+                missing.append(key)
+            else:
+                results[key] = cached
+        
+        if missing:
+            try:
+                stored = self.db.get_ingredient_classifications(missing, self.model_name)
+            except Exception as e:
+                logger.warning(f"⚠️  Sınıflandırma önbelleği okunamadı: {str(e)}")
+                stored = {}
+            
+            for key, top in stored.items():
+                self.label_cache.set(key, top)
+                results[key] = top
+            missing = [key for key in missing if key not in stored]
+        
+        if missing and self.classifier:
+            with span("zero_shot"):
+                outputs = self.classifier(
+                    missing,
+                    GLUTEN_LABELS,
+                    multi_label=False,
+                    batch_size=settings.nlp_batch_size
+                )
+            if isinstance(outputs, dict):
+                outputs = [outputs]
+            
+            classified = {}
+            for key, output in zip(missing, outputs):
+                top = (output["labels"][0], float(output["scores"][0]))
+                self.label_cache.set(key, top)
+                classified[key] = top
+            results.update(classified)
+            
+            try:
+                self.db.save_ingredient_classifications(
+                    classified, self.model_name, self.ruleset.version
+                )
+            except Exception as e:
+                logger.warning(f"⚠️  Sınıflandırmalar kaydedilemedi: {str(e)}")
+        
+        return results
     
     def analyze_ingredients(self, ingredients_list: List[str]) -> Dict[str, Any]:
         """
@@ -65,6 +183,8 @@ class NLPAnalyzer:
             }
         
         try:
+            # Analiz boyunca aynı kural seti kullanılır
+            ruleset = self.ruleset
             detected_ingredients = []
             has_dangerous = False
             has_risky = False
@@ -72,54 +192,45 @@ class NLPAnalyzer:
             
             # Her malzemeyi kontrol et
             for ingredient in ingredients_list:
-                ingredient_lower = ingredient.lower().strip()
+                # 1. KURAL TABANLI KONTROL (tek geçişte tüm anahtar kelimeler)
+                matches = ruleset.find_matches(ingredient)
+                risk_levels = {match["risk_level"] for match in matches}
                 
-                # 1. KURAL TABANLI KONTROLİZE
-                # Tehlikeli malzemeleri kontrol et
-                for dangerous in self.dangerous_ingredients:
-                    if dangerous.lower() in ingredient_lower:
-                        detected_ingredients.append({
-                            "ingredient": ingredient,
-                            "risk_level": "dangerous",
-                            "confidence": 0.99,
-                            "reason": "Gluten içeren malzeme"
-                        })
-                        has_dangerous = True
-                        confidence_scores.append(0.99)
-                        break
-                else:
-                    # Riskli kelimeleri kontrol et
-                    for risky in self.risky_keywords:
-                        if risky.lower() in ingredient_lower:
-                            detected_ingredients.append({
-                                "ingredient": ingredient,
-                                "risk_level": "risky",
-                                "confidence": 0.85,
-                                "reason": "Çapraz bulaş veya belirsiz malzeme"
-                            })
-                            has_risky = True
-                            confidence_scores.append(0.85)
-                            break
+                if "dangerous" in risk_levels:
+                    detected_ingredients.append({
+                        "ingredient": ingredient,
+                        "risk_level": "dangerous",
+                        "confidence": 0.99,
+                        "reason": "Gluten içeren malzeme",
+                        "matches": matches
+                    })
+                    has_dangerous = True
+                    confidence_scores.append(0.99)
+                elif "risky" in risk_levels:
+                    detected_ingredients.append({
+                        "ingredient": ingredient,
+                        "risk_level": "risky",
+                        "confidence": 0.85,
+                        "reason": "Çapraz bulaş veya belirsiz malzeme",
+                        "matches": matches
+                    })
+                    has_risky = True
+                    confidence_scores.append(0.85)
             
             # 2. BAĞLAMSAL ANALIZ (NLP MODEL)
             # Eğer model varsa ve tehlikeli malzeme bulunmadıysa, daha derinlemesine analiz yap
             if self.classifier and not has_dangerous and ingredients_list:
                 try:
-                    # Gluten ile ilgili malzemelerin sınıflandırılması
-                    gluten_related_labels = ["contains gluten", "gluten-free", "uncertain"]
+                    # Kurallarla yakalanmayan malzemeleri tek seferde sınıflandır
+                    detected_names = {d.get("ingredient") for d in detected_ingredients}
+                    unmatched = [i for i in ingredients_list if i not in detected_names]
+                    classifications = self.classify_ingredients(unmatched)
                     
-                    # Her malzemeyi sınıflandır
-                    for ingredient in ingredients_list:
-                        if ingredient not in [d.get("ingredient") for d in detected_ingredients]:
-                            results = self.classifier(
-                                ingredient,
-                                gluten_related_labels,
-                                multi_class=False
-                            )
-                            
+                    for ingredient in unmatched:
+                        classification = classifications.get(normalize_ingredient(ingredient))
+                        if classification:
                             # En yüksek score'u al
-                            top_label = results["labels"][0]
-                            top_score = results["scores"][0]
+                            top_label, top_score = classification
                             
                             if "gluten" in top_label.lower() and top_score > 0.7:
                                 detected_ingredients.append({
@@ -154,7 +265,8 @@ class NLPAnalyzer:
                 "detected_ingredients": detected_ingredients,
                 "explanation": explanation,
                 "confidence": round(avg_confidence, 3),
-                "recommendations": self._get_recommendations(overall_risk)
+                "recommendations": self._get_recommendations(overall_risk),
+                "ruleset_version": ruleset.version
             }
         
         except Exception as e:
@@ -184,25 +296,18 @@ class NLPAnalyzer:
             }
         
         try:
-            text_lower = text.lower()
-            
-            # Tehlikeli kelimeleri ara
-            dangerous_count = 0
-            dangerous_found = []
-            
-            for ingredient in self.dangerous_ingredients:
-                if ingredient.lower() in text_lower:
-                    dangerous_count += 1
-                    dangerous_found.append(ingredient)
-            
-            # Riskli kelimeleri ara
-            risky_count = 0
-            risky_found = []
+            # Tehlikeli ve riskli kelimeleri tek geçişte ara
+            ruleset = self.ruleset
+            matches = ruleset.find_matches(text)
             
-            for keyword in self.risky_keywords:
-                if keyword.lower() in text_lower:
-                    risky_count += 1
-                    risky_found.append(keyword)
+            dangerous_found = list(dict.fromkeys(
+                match["keyword"] for match in matches if match["risk_level"] == "dangerous"
+            ))
+            risky_found = list(dict.fromkeys(
+                match["keyword"] for match in matches if match["risk_level"] == "risky"
+            ))
+            dangerous_count = len(dangerous_found)
+            risky_count = len(risky_found)
             
             # Risk belirle
             if dangerous_count > 0:
@@ -221,8 +326,10 @@ class NLPAnalyzer:
                 "cross_contamination_risk": risky_count > 0,
                 "dangerous_ingredients_found": dangerous_found,
                 "risky_keywords_found": risky_found,
+                "matches": matches,
                 "explanation": explanation,
-                "recommendations": self._get_recommendations(risk_level)
+                "recommendations": self._get_recommendations(risk_level),
+                "ruleset_version": ruleset.version
             }
         
         except Exception as e:
@@ -278,10 +385,13 @@ class NLPAnalyzer:
 
 # Global NLP instance
 nlp_analyzer = None
+_nlp_analyzer_lock = threading.Lock()
 
 def get_nlp_analyzer() -> NLPAnalyzer:
-    """NLP analyzer'ı lazily yükle"""
+    """NLP analyzer'ı lazily yükle (eşzamanlı ilk çağrılar modeli bir kez yükler)"""
     global nlp_analyzer
     if nlp_analyzer is None:
-        nlp_analyzer = NLPAnalyzer()
+        with _nlp_analyzer_lock:
+            if nlp_analyzer is None:
+                nlp_analyzer = NLPAnalyzer()
     return nlp_analyzer
@@ -1,38 +1,94 @@
 """
 OCR Engine - EasyOCR ile metin tanıma
 """
+import importlib.util
 import io
+import threading
+import time
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-try:
-    import easyocr
-    HAS_EASYOCR = True
-except ImportError:
-    HAS_EASYOCR = False
+# easyocr (ve torch) yalnızca motor oluşturulurken import edilir
+HAS_EASYOCR = importlib.util.find_spec("easyocr") is not None
 
+from config import settings
+from utils.helpers import fold_turkish
+from utils.image_preprocessing import preprocess_image, resolve_preset
 from utils.logger import logger
+from utils.timing import span
+
+
+# İçindekiler başlığı araması (Türkçe katlanmış, boşluksuz). OCR hatalarına
+# dayanıklı olmak için kelimelerin yalnızca başı aranır.
+INGREDIENT_HEADER_PREFIXES = ("icindek", "bilesen", "bilesim", "malzeme", "icerig", "ingredien")
+
+# Başlık aramasında her satır kutusunun yalnızca baştaki bu kadar "satır
+# yüksekliği" genişliğindeki kısmı tanınır (~12 karakter)
+HEADER_PROBE_WIDTH = 7
+
+
+def _is_ingredient_header(text: str) -> bool:
+    folded = "".join(fold_turkish(text).split())
+    return any(prefix in folded for prefix in INGREDIENT_HEADER_PREFIXES)
+
+
+def select_ingredients_block(boxes: List[List[int]], header: int, max_gap: float) -> List[List[int]]:
+    """
+    Başlık kutusundan başlayarak içindekiler bloğunu oluşturan kutuları seç
+
+    Başlık satırı ve altındaki satırlar, blok dışındaki sütunlara (sol ya
+    da sağ) taşmadan, satır yüksekliğinin `max_gap` katından büyük ilk
+    dikey boşluğa (ör. besin değerleri tablosu) kadar alınır.
+
+    Args:
+        boxes: [x_min, x_max, y_min, y_max] listesi (EasyOCR detect çıktısı)
+        header: Başlığı içeren kutunun indeksi
+    """
+    x_min, x_max, y_min, y_max = boxes[header]
+    line_height = max(1, y_max - y_min)
+    margin = 2 * line_height
+    left, right, bottom = x_min, x_max, y_max
+
+    block = []
+    for box in sorted(boxes, key=lambda b: (b[2], b[0])):
+        if box[2] < y_min - line_height / 2:
+            continue
+        if box[1] < left - margin or box[0] > right + margin:
+            continue
+        if box[2] - bottom > max_gap * line_height:
+            break
+        block.append(box)
+        right = max(right, box[1])
+        bottom = max(bottom, box[3])
+    return block
 
 
 class OCREngine:
     """EasyOCR ile metin tanıma motoru"""
     
-    def __init__(self, languages: list = ["tr", "en"]):
+    def __init__(self, languages: list = ["tr", "en"], preset: Optional[str] = None):
         """
         OCR Engine'i başlat
         
         Args:
             languages: Tanımlanacak diller (Türkçe + İngilizce)
+            preset: Ön işleme preset'i (varsayılan: settings.ocr_preprocess_preset)
         """
         self.languages = languages
         self.reader = None
+        self.preprocess_options = resolve_preset(
+            preset or settings.ocr_preprocess_preset,
+            settings.ocr_max_image_side
+        )
         
         if HAS_EASYOCR:
             try:
                 logger.info(f"🚀 EasyOCR yükleniyor (Diller: {', '.join(languages)})...")
+                import easyocr
+                
                 self.reader = easyocr.Reader(languages, gpu=False)
                 logger.info("✅ EasyOCR hazır")
             except Exception as e:
@@ -41,6 +97,26 @@ class OCREngine:
         else:
             logger.warning("⚠️  EasyOCR kurulu değil. Kurulum: pip install easyocr")
     
+    def prepare_image(self, image_bytes: bytes):
+        """Ön işleme hattını uygula (küçültme, gri ton, EXIF yönü, kontrast)"""
+        started = time.perf_counter()
+        image = preprocess_image(image_bytes, self.preprocess_options)
+        logger.debug(
+            f"📸 Görüntü hazırlandı: {image.shape[1]}x{image.shape[0]} "
+            f"({(time.perf_counter() - started) * 1000:.1f} ms)"
+        )
+        return image
+    
+    def warmup(self):
+        """Boş bir görüntü üzerinde OCR çalıştırarak modeli ısıt"""
+        if not self.reader:
+            return
+        from PIL import Image
+        
+        buffer = io.BytesIO()
+        Image.new("L", (320, 96), color=255).save(buffer, "PNG")
+        self.extract_text_with_confidence(buffer.getvalue())
+    
     def extract_text_from_image(self, image_bytes: bytes) -> Optional[str]:
         """
         Görselden metin çıkart
@@ -56,11 +132,8 @@ class OCREngine:
             return None
         
         try:
-            # PIL ile görseli yükle
-            from PIL import Image
-            
-            image = Image.open(io.BytesIO(image_bytes))
-            logger.debug(f"📸 Görüntü yüklendi: {image.size}")
+            # Görseli yükle ve OCR için hazırla
+            image = self.prepare_image(image_bytes)
             
             # OCR işlemini yap
             logger.debug("🔍 Metin tanıması başlatılıyor...")
@@ -91,10 +164,15 @@ class OCREngine:
             return None
         
         try:
-            from PIL import Image
-            
-            image = Image.open(io.BytesIO(image_bytes))
-            results = self.reader.readtext(image, detail=1)  # detail=1: metin + güven
+            # Süreler yalnızca toplanır; histograma OCRPool üst süreçte yazar
+            with span("ocr_decode"):
+                image = self.prepare_image(image_bytes)
+            roi = None
+            with span("ocr_recognition"):
+                if settings.ocr_roi_enabled:
+                    results, roi = self._read_ingredients_region(image)
+                else:
+                    results = self.reader.readtext(image, detail=1)  # detail=1: metin + güven
             
             # Metin ve güven oranlarını ayıkla
             texts = []
@@ -115,18 +193,71 @@ class OCREngine:
             
             logger.info(f"✅ OCR tamamlandı (Güven: %{avg_confidence*100:.1f})")
             
-            return {
+            response = {
                 "text": full_text,
                 "confidence": round(avg_confidence, 3),
                 "details": details,
                 "line_count": len(texts)
             }
+            if roi is not None:
+                response["roi"] = roi
+            return response
         
         except Exception as e:
             logger.error(f"❌ OCR hatası: {str(e)}", exc_info=True)
             return None
     
-    def extract_ingredients_from_text(self, text: str) -> Optional[list]:
+    def _read_ingredients_region(self, image) -> Tuple[list, Dict[str, Any]]:
+        """
+        İki geçişli OCR: metin kutularını bul, yalnızca içindekiler bloğunu tanı
+        
+        1. detect ile tüm satır kutuları bulunur (tanıma yapılmaz)
+        2. Her kutunun yalnızca başı tanınarak içindekiler başlığı aranır
+        3. Başlık bulunursa yalnızca o blok, bulunamazsa tüm kutular tanınır
+        
+        Returns:
+            (readtext biçiminde sonuçlar, {"used": bool, "boxes": n, "total_boxes": m})
+        """
+        import numpy as np
+        
+        # recognize gri ton bekler
+        grey = image if image.ndim == 2 else np.dot(image[..., :3], [0.299, 0.587, 0.114]).astype(np.uint8)
+        
+        horizontal_list, free_list = self.reader.detect(image)
+        boxes = [[int(v) for v in box] for box in horizontal_list[0]]
+        rotated = free_list[0]
+        total = len(boxes) + len(rotated)
+        
+        header = None
+        if boxes:
+            probes = [
+                [x_min, min(x_max, x_min + HEADER_PROBE_WIDTH * (y_max - y_min)), y_min, y_max]
+                for x_min, x_max, y_min, y_max in boxes
+            ]
+            for bbox, text, _ in self.reader.recognize(grey, horizontal_list=probes, free_list=[], detail=1):
+                if _is_ingredient_header(text):
+                    # recognize sonuçları sıralar: kutuyu sol üst köşesinden eşle
+                    x, y = bbox[0]
+                    header = min(
+                        range(len(boxes)),
+                        key=lambda i: abs(max(0, boxes[i][0]) - x) + abs(max(0, boxes[i][2]) - y)
+                    )
+                    break
+        
+        if header is None:
+            logger.debug("🔎 İçindekiler başlığı bulunamadı, tüm görüntü tanınıyor")
+            results = self.reader.recognize(grey, horizontal_list=boxes, free_list=rotated, detail=1)
+            return results, {"used": False, "boxes": total, "total_boxes": total}
+        
+        block = select_ingredients_block(boxes, header, settings.ocr_roi_max_gap)
+        logger.debug(f"🔎 İçindekiler bloğu: {len(block)}/{total} kutu tanınıyor")
+        results = self.reader.recognize(grey, horizontal_list=block, free_list=[], detail=1)
+        # Okuma sırası: yukarıdan aşağı, soldan sağa
+        results = sorted(results, key=lambda r: (r[0][0][1], r[0][0][0]))
+        return results, {"used": True, "boxes": len(block), "total_boxes": total}
+    
+    @staticmethod
+    def extract_ingredients_from_text(text: str) -> Optional[list]:
         """
         Metin içerisinden malzemeleri ayıkla
         Tipik format: "İçindekiler: madde1, madde2, madde3..."
@@ -195,10 +326,13 @@ class OCREngine:
 
 # Global OCR instance
 ocr_engine = None
+_ocr_engine_lock = threading.Lock()
 
 def get_ocr_engine() -> OCREngine:
-    """OCR engine'ini lazily yükle"""
+    """OCR engine'ini lazily yükle (eşzamanlı ilk çağrılar modeli bir kez yükler)"""
     global ocr_engine
     if ocr_engine is None:
-        ocr_engine = OCREngine()
+        with _ocr_engine_lock:
+            if ocr_engine is None:
+                ocr_engine = OCREngine()
     return ocr_engine
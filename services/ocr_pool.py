@@ -0,0 +1,175 @@
+"""
+OCR Havuzu - EasyOCR'ı ayrı süreçlerde, sınırlı kuyrukla çalıştırır
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+import sys
+
+from starlette.concurrency import run_in_threadpool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from services.ocr_engine import OCREngine, get_ocr_engine
+from utils.logger import logger
+from utils.metrics import OCR_IN_FLIGHT, OCR_REJECTED, record_stage
+from utils.timing import collect_spans, span
+
+
+class OCRQueueFullError(Exception):
+    """OCR kuyruğu dolu - istemci daha sonra tekrar denemeli"""
+
+
+# ==================== WORKER SÜREÇLERİ ====================
+
+# Her worker süreci kendi easyocr.Reader'ını bir kez yükler
+_worker_engine: Optional[OCREngine] = None
+
+
+def _init_worker(languages: list):
+    global _worker_engine
+    _worker_engine = OCREngine(languages)
+
+
+def _run_ocr(image_bytes: bytes, engine: Optional[OCREngine] = None) -> Tuple[Optional[Dict[str, Any]], Dict[str, list]]:
+    # Aşama süreleri metriklere ve istek zamanlamasına üst süreçte yazılmak
+    # üzere geri döner (worker'daki metrikler PROMETHEUS_MULTIPROC_DIR'sız kaybolur)
+    with collect_spans() as collector:
+        result = (engine or _worker_engine).extract_text_with_confidence(image_bytes)
+    return result, collector.spans
+
+
+def _warmup_worker() -> bool:
+    _worker_engine.warmup()
+    return _worker_engine.reader is not None
+
+
+# ==================== HAVUZ ====================
+
+class OCRPool:
+    """OCR işlerini süreç havuzuna dağıtır
+
+    Aynı anda en fazla `ocr_workers + ocr_queue_size` iş kabul edilir;
+    fazlası OCRQueueFullError ile hemen reddedilir (route 503 + Retry-After
+    döner). Havuz başlatılmadıysa OCR süreç içindeki motorla bir thread'de
+    çalışır.
+    """
+
+    def __init__(self, languages: Optional[list] = None):
+        self.languages = languages or ["tr", "en"]
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    @property
+    def capacity(self) -> int:
+        workers = settings.ocr_workers if self.running else 1
+        return workers + settings.ocr_queue_size
+
+    def start(self):
+        """Worker süreçlerini başlat"""
+        if self._executor is not None:
+            return
+        # fork yerine spawn: üst süreçteki thread'ler ve SQLite bağlantıları miras alınmaz
+        self._executor = ProcessPoolExecutor(
+            max_workers=settings.ocr_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.languages,)
+        )
+        logger.info(f"🧵 OCR süreç havuzu başlatıldı ({settings.ocr_workers} worker, kuyruk {settings.ocr_queue_size})")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def is_available(self) -> bool:
+        """OCR yapılabilir mi? (havuz yoksa süreç içi motoru yükler)"""
+        if self.running:
+            return True
+        engine = await run_in_threadpool(get_ocr_engine)
+        return engine.reader is not None
+
+    async def warmup(self) -> bool:
+        """
+        Her worker'ı başlatıp örnek OCR çalıştır (havuz yoksa süreç içi motoru)
+        
+        Returns:
+            OCR kullanılabilir mi
+        """
+        if self._executor is None:
+            engine = await run_in_threadpool(get_ocr_engine)
+            await run_in_threadpool(engine.warmup)
+            return engine.reader is not None
+        
+        # spawn bağlamında worker'lar ihtiyaç oldukça başlatılır: hepsini aynı anda meşgul et
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _warmup_worker)
+            for _ in range(settings.ocr_workers)
+        ))
+        return all(results)
+    
+    async def extract_text_with_confidence(self, image_bytes: bytes) -> Optional[Dict[str, Any]]:
+        """OCREngine.extract_text_with_confidence'ın havuzlu, awaitable karşılığı"""
+        if self.pending >= self.capacity:
+            self.rejected += 1
+            OCR_REJECTED.inc()
+            raise OCRQueueFullError("OCR kuyruğu dolu")
+
+        self.pending += 1
+        OCR_IN_FLIGHT.inc()
+        try:
+            if self._executor is None:
+                engine = await run_in_threadpool(get_ocr_engine)
+                with span("ocr"):
+                    result, spans = await run_in_threadpool(_run_ocr, image_bytes, engine)
+                self._record_stages(spans)
+                return result
+
+            loop = asyncio.get_running_loop()
+            executor = self._executor
+            try:
+                # "ocr" kuyrukta bekleme ve süreçler arası aktarımı da içerir
+                with span("ocr"):
+                    result, spans = await loop.run_in_executor(executor, _run_ocr, image_bytes)
+                self._record_stages(spans)
+                return result
+            except BrokenProcessPool:
+                # Bir worker çöktü (ör. bellek yetersizliği): havuzu bir kez yeniden kur
+                if self._executor is executor:
+                    logger.error("❌ OCR süreç havuzu bozuldu, yeniden başlatılıyor")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = None
+                    self.start()
+                raise
+        finally:
+            self.pending -= 1
+            OCR_IN_FLIGHT.dec()
+
+    @staticmethod
+    def _record_stages(spans: Dict[str, list]):
+        for name, (duration_ms, count) in spans.items():
+            record_stage(name, duration_ms, count)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": settings.ocr_workers if self.running else 0,
+            "pending": self.pending,
+            "capacity": self.capacity,
+            "rejected": self.rejected
+        }
+
+
+# Global OCR pool instance
+ocr_pool = OCRPool()
@@ -0,0 +1,106 @@
+"""
+Hazırlık Durumu - modellerin başlangıçta ısıtılması ve bileşen bazlı /ready
+"""
+import asyncio
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+import sys
+
+from starlette.concurrency import run_in_threadpool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from services.nlp_analyzer import get_nlp_analyzer
+from services.ocr_pool import ocr_pool
+from utils.logger import logger
+
+
+# Bileşen durumları
+PENDING = "pending"          # ısıtma sırası bekleniyor
+WARMING = "warming"          # yükleniyor
+READY = "ready"              # kullanıma hazır
+LAZY = "lazy"                # ısıtma kapalı, ilk istekte yüklenir
+UNAVAILABLE = "unavailable"  # bağımlılık kurulu değil (mock yanıt döner)
+FAILED = "failed"            # yükleme hatası
+
+# Bu durumlardaki bileşen genel hazırlığı engeller
+_BLOCKING = (PENDING, WARMING, FAILED)
+
+
+class ReadinessTracker:
+    """Bileşenlerin hazırlık durumunu tutar, modelleri arka planda ısıtır
+
+    Isıtma lifespan'i bekletmez: uygulama hemen istek kabul eder, `/ready`
+    ise modeller yüklenene kadar 503 döner. Böylece yük dengeleyici yeni
+    örneğe trafiği ancak ısındıktan sonra yönlendirir.
+    """
+
+    def __init__(self):
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def set_status(self, name: str, status: str, **details):
+        self.components[name] = {"status": status, **details}
+
+    async def start(self):
+        """Veritabanı/kural seti hazır; modelleri ayarlara göre ısıtmaya başla"""
+        self.set_status("database", READY)
+        self.set_status("ruleset", READY)
+
+        targets = []
+        for name, enabled in (("nlp", settings.warmup_nlp), ("ocr", settings.warmup_ocr)):
+            if enabled:
+                self.set_status(name, PENDING)
+                targets.append(name)
+            else:
+                self.set_status(name, LAZY)
+
+        if targets:
+            self._task = asyncio.create_task(self._warmup(targets))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _warmup(self, targets: List[str]):
+        # Modeller sırayla yüklenir: aynı anda iki büyük model belleği zorlar
+        for name in targets:
+            self.set_status(name, WARMING)
+            started = time.perf_counter()
+            try:
+                if name == "nlp":
+                    available = await self._warmup_nlp()
+                else:
+                    available = await ocr_pool.warmup()
+            except Exception as e:
+                logger.error(f"❌ {name} ısıtılamadı: {str(e)}", exc_info=True)
+                self.set_status(name, FAILED, error=str(e))
+                continue
+
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.set_status(name, READY if available else UNAVAILABLE, warmup_ms=duration_ms)
+            logger.info(f"🔥 {name} ısıtıldı ({duration_ms:.0f} ms)")
+
+    @staticmethod
+    async def _warmup_nlp() -> bool:
+        analyzer = await run_in_threadpool(get_nlp_analyzer)
+        await run_in_threadpool(analyzer.warmup)
+        # Model olmadan da anahtar kelime analizi çalışır
+        return True
+
+    def is_ready(self, component: Optional[str] = None) -> bool:
+        """Genel ya da tek bir bileşenin hazırlığı"""
+        if component is not None:
+            return self.components.get(component, {}).get("status") in (READY, LAZY)
+        return all(c["status"] not in _BLOCKING for c in self.components.values())
+
+
+# Global readiness tracker instance
+readiness = ReadinessTracker()
@@ -0,0 +1,223 @@
+"""
+Görüntü Sonuç Önbelleği - yüklenen etiket fotoğrafları için OCR + analiz sonuçları
+"""
+import hashlib
+import io
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from utils.logger import logger
+from utils.metrics import record_cache_lookup
+
+
+def perceptual_hash(image_bytes: bytes) -> Optional[int]:
+    """
+    64 bit fark hash'i (dHash): yeniden sıkıştırma, küçük ölçek ve parlaklık
+    farklarına dayanıklıdır. Görüntü açılamazsa None döner.
+    """
+    try:
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(image_bytes))
+        # JPEG'i doğrudan küçük ölçekte çöz (tam çözünürlüğe gerek yok)
+        image.draft("L", (64, 64))
+        pixels = list(image.convert("L").resize((9, 8)).getdata())
+    except Exception:
+        return None
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def _to_signed(value: int) -> int:
+    # SQLite INTEGER işaretli 64 bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+class ImageResultCache:
+    """İçerik adresli, diskte kalıcı, boyut sınırlı sonuç önbelleği
+
+    Anahtar yüklenen baytların SHA-256 özetidir; aynı fotoğraf tekrar
+    yüklendiğinde OCR ve NLP yeniden çalışmaz. İsteğe bağlı olarak algısal
+    hash ile neredeyse aynı fotoğraflar da eşleştirilir (varsayılan kapalı:
+    farklı ürünlerin benzer etiketleri yanlış eşleşebilir). Toplam boyut
+    `image_cache_max_bytes`'ı aşınca en uzun süredir kullanılmayan kayıtlar
+    silinir. Dosya tüm worker'lar arasında paylaşılır.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.perceptual_hits = 0
+        self.misses = 0
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS image_results (
+                content_hash TEXT PRIMARY KEY,
+                phash INTEGER,
+                ocr_json TEXT NOT NULL,
+                response_json TEXT,
+                ruleset_version INTEGER,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_image_results_access ON image_results(last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def fingerprint(self, image_bytes: bytes) -> Tuple[str, Optional[int]]:
+        """(içerik hash'i, algısal hash) - algısal hash yalnızca etkinse hesaplanır"""
+        content_hash = hashlib.sha256(image_bytes).hexdigest()
+        phash = perceptual_hash(image_bytes) if settings.image_cache_perceptual else None
+        return content_hash, phash
+
+    def get(self, fingerprint: Tuple[str, Optional[int]]) -> Optional[Dict[str, Any]]:
+        """
+        Önbellekteki sonucu getir
+
+        Returns:
+            {"ocr_result": {...}, "response": {...} | None, "ruleset_version": 3, "match": "exact"}
+        """
+        content_hash, phash = fingerprint
+        with self._lock:
+            conn = self._get_conn()
+            row = conn.execute("""
+            SELECT content_hash, ocr_json, response_json, ruleset_version
+            FROM image_results WHERE content_hash = ?
+            """, (content_hash,)).fetchone()
+            match = "exact"
+
+            if row is None and phash is not None:
+                row = self._find_similar(conn, phash)
+                match = "perceptual"
+
+            if row is None:
+                self.misses += 1
+                record_cache_lookup("image", False)
+                return None
+
+            conn.execute(
+                "UPDATE image_results SET last_access = ? WHERE content_hash = ?",
+                (time.time(), row[0])
+            )
+            conn.commit()
+
+        record_cache_lookup("image", True)
+        if match == "exact":
+            self.exact_hits += 1
+        else:
+            self.perceptual_hits += 1
+
+        return {
+            "ocr_result": json.loads(row[1]),
+            "response": json.loads(row[2]) if row[2] else None,
+            "ruleset_version": row[3],
+            "match": match
+        }
+
+    def _find_similar(self, conn: sqlite3.Connection, phash: int):
+        max_distance = settings.image_cache_phash_distance
+        best, best_distance = None, max_distance + 1
+        for content_hash, stored in conn.execute(
+            "SELECT content_hash, phash FROM image_results WHERE phash IS NOT NULL"
+        ):
+            distance = ((stored & 0xFFFFFFFFFFFFFFFF) ^ phash).bit_count()
+            if distance < best_distance:
+                best, best_distance = content_hash, distance
+        if best is None:
+            return None
+        return conn.execute("""
+        SELECT content_hash, ocr_json, response_json, ruleset_version
+        FROM image_results WHERE content_hash = ?
+        """, (best,)).fetchone()
+
+    def put(self, fingerprint: Tuple[str, Optional[int]], ocr_result: Dict[str, Any],
+            response: Optional[Dict[str, Any]] = None, ruleset_version: Optional[int] = None):
+        """OCR sonucunu (ve varsa son yanıtı) kaydet, gerekirse eski kayıtları sil"""
+        content_hash, phash = fingerprint
+        ocr_json = json.dumps(ocr_result, ensure_ascii=False)
+        response_json = json.dumps(response, ensure_ascii=False) if response is not None else None
+        size = len(ocr_json) + len(response_json or "")
+
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("""
+            INSERT INTO image_results
+            (content_hash, phash, ocr_json, response_json, ruleset_version, size, last_access)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(content_hash) DO UPDATE SET
+                ocr_json = excluded.ocr_json,
+                response_json = excluded.response_json,
+                ruleset_version = excluded.ruleset_version,
+                size = excluded.size,
+                last_access = excluded.last_access
+            """, (
+                content_hash,
+                _to_signed(phash) if phash is not None else None,
+                ocr_json, response_json, ruleset_version, size, time.time()
+            ))
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM image_results").fetchone()[0]
+        overflow = total - settings.image_cache_max_bytes
+        if overflow <= 0:
+            return
+
+        evicted = 0
+        rows = conn.execute("SELECT content_hash, size FROM image_results ORDER BY last_access").fetchall()
+        for content_hash, size in rows:
+            if overflow <= 0:
+                break
+            conn.execute("DELETE FROM image_results WHERE content_hash = ?", (content_hash,))
+            overflow -= size
+            evicted += 1
+        logger.debug(f"🧹 Görüntü önbelleğinden {evicted} kayıt silindi")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._get_conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM image_results"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": settings.image_cache_max_bytes,
+            "exact_hits": self.exact_hits,
+            "perceptual_hits": self.perceptual_hits,
+            "misses": self.misses
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global image result cache instance
+image_cache = ImageResultCache(settings.image_cache_path)
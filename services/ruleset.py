@@ -0,0 +1,142 @@
+"""
+Kural Seti - sürümlü ve sıcak yeniden yüklenebilir gluten anahtar kelimeleri
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+import sys
+
+from starlette.concurrency import run_in_threadpool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from db.database import Database, db
+from utils.aho_corasick import AhoCorasick
+from utils.helpers import turkish_casefold
+from utils.logger import logger
+from utils.timing import span
+
+
+class Ruleset:
+    """Değişmez kural seti anlık görüntüsü
+
+    Analizler başlarken güncel Ruleset'i bir kez alır ve sonuna kadar onu
+    kullanır; yeniden yükleme yeni bir nesne oluşturup referansı değiştirir,
+    böylece süren analizler tutarlı bir kural setiyle biter.
+    """
+
+    def __init__(self, version: int, dangerous: List[str], risky: List[str]):
+        self.version = version
+        self.dangerous_ingredients = list(dangerous)
+        self.risky_keywords = list(risky)
+        self.built_at = time.time()
+        self.matcher = self._build_matcher(self.dangerous_ingredients, self.risky_keywords)
+
+    @staticmethod
+    def _build_matcher(dangerous: List[str], risky: List[str]) -> AhoCorasick:
+        """Anahtar kelimeleri Türkçe küçük harfe çevirip tek otomata derle"""
+        patterns = [
+            (turkish_casefold(keyword).strip(), (keyword, "dangerous"))
+            for keyword in dangerous
+        ] + [
+            (turkish_casefold(keyword).strip(), (keyword, "risky"))
+            for keyword in risky
+        ]
+        return AhoCorasick(patterns)
+
+    def find_matches(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Metindeki tüm tehlikeli/riskli anahtar kelimeleri tek geçişte bul
+
+        Returns:
+            [{"keyword": "Buğday", "risk_level": "dangerous", "start": 0, "end": 6}, ...]
+        """
+        with span("rule_matching"):
+            return [
+                {"keyword": keyword, "risk_level": risk_level, "start": start, "end": end}
+                for start, end, (keyword, risk_level) in self.matcher.find_all(turkish_casefold(text))
+            ]
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "built_at": datetime.fromtimestamp(self.built_at, tz=timezone.utc).isoformat(),
+            "dangerous_count": len(self.dangerous_ingredients),
+            "risky_count": len(self.risky_keywords)
+        }
+
+
+class StaticRulesets:
+    """Tek bir Ruleset'i RulesetManager gibi sunar (çevrimdışı işler, veritabanı yoklanmaz)"""
+
+    def __init__(self, ruleset: Ruleset):
+        self.current = ruleset
+
+
+class RulesetManager:
+    """Güncel Ruleset'i tutar, sürüm sayacı değişince arka planda yeniden kurar"""
+
+    def __init__(self, database: Database):
+        self._db = database
+        self._current: Optional[Ruleset] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def current(self) -> Ruleset:
+        """Aktif kural seti (ilk erişimde yüklenir)"""
+        ruleset = self._current
+        if ruleset is None:
+            self.refresh()
+            ruleset = self._current
+        return ruleset
+
+    def refresh(self, force: bool = False) -> bool:
+        """Sürüm değiştiyse kural setini yeniden kur; değiştiyse True döner"""
+        with self._lock:
+            current = self._current
+            if not force and current is not None:
+                if self._db.get_ruleset_version() == current.version:
+                    return False
+
+            snapshot = self._db.get_ruleset_snapshot()
+            ruleset = Ruleset(snapshot["version"], snapshot["dangerous"], snapshot["risky"])
+            # Tek referans ataması: okuyucular eski ya da yeni setin tamamını görür
+            self._current = ruleset
+
+        logger.info(
+            f"📚 Kural seti v{ruleset.version} yüklendi "
+            f"(⚠️  {len(ruleset.dangerous_ingredients)} tehlikeli, 🟡 {len(ruleset.risky_keywords)} riskli)"
+        )
+        return True
+
+    async def start(self):
+        """Periyodik sürüm kontrolünü başlat"""
+        await run_in_threadpool(self.refresh)
+        if settings.ruleset_refresh_interval > 0:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.ruleset_refresh_interval)
+            try:
+                await run_in_threadpool(self.refresh)
+            except Exception as e:
+                logger.warning(f"⚠️  Kural seti yenilenemedi: {str(e)}")
+
+
+# Global ruleset manager instance
+ruleset_manager = RulesetManager(db)
@@ -0,0 +1,82 @@
+"""
+Aho-Corasick çoklu desen eşleştirici
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class AhoCorasick:
+    """Çok sayıda anahtar kelimeyi metin üzerinde tek geçişte arar
+
+    Desenler bir kez trie + failure link otomatına derlenir; arama süresi
+    desen sayısından bağımsız olarak O(metin uzunluğu + eşleşme sayısı)'dır.
+    Eşleştirme büyük/küçük harf duyarlıdır, normalizasyon çağıranın işidir.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        """
+        Args:
+            patterns: (desen, payload) çiftleri; boş desenler yok sayılır
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Her düğümde biten desenler: (desen uzunluğu, payload)
+        self._outputs: List[List[Tuple[int, Any]]] = [[]]
+        self.pattern_count = 0
+
+        for pattern, payload in patterns:
+            if pattern:
+                self._add(pattern, payload)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, payload: Any):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+        self._outputs[node].append((len(pattern), payload))
+        self.pattern_count += 1
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Sonek olarak biten desenleri de bu düğümden raporla
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        """
+        Metindeki tüm (çakışan olanlar dahil) eşleşmeleri bul
+
+        Returns:
+            (başlangıç, bitiş, payload) listesi, bitiş konumuna göre sıralı
+        """
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        matches = []
+        node = 0
+
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                end = index + 1
+                for length, payload in outputs[node]:
+                    matches.append((end - length, end, payload))
+
+        return matches
@@ -0,0 +1,75 @@
+"""
+Bloom filtresi - "kesinlikle yok" sorguları için olasılıksal küme
+"""
+import hashlib
+import math
+import threading
+from typing import Any, Dict
+
+
+class BloomFilter:
+    """Sabit boyutlu Bloom filtresi
+
+    `item in bloom` False ise öğe kesinlikle eklenmemiştir; True ise
+    yaklaşık `error_rate` olasılıkla yanlış pozitif olabilir. Silme
+    desteklenmez: silinen öğeler yeniden oluşturulana kadar "olabilir"
+    yanıtı verir (yalnızca gereksiz bir veritabanı sorgusuna yol açar).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("capacity pozitif olmalıdır")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate 0 ile 1 arasında olmalıdır")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # m = -n·ln(p) / ln(2)², k = (m/n)·ln(2)
+        self.bit_count = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self._bits = bytearray((self.bit_count + 7) // 8)
+        self._lock = threading.Lock()
+        self.items = 0
+
+    def _positions(self, item: str):
+        # Çift hash (Kirsch-Mitzenmacher): h1 + i·h2
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, item: str):
+        positions = list(self._positions(item))
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.items += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def fill_ratio(self) -> float:
+        """Set edilmiş bit oranı"""
+        return int.from_bytes(self._bits, "little").bit_count() / self.bit_count
+
+    def estimated_false_positive_rate(self) -> float:
+        """Mevcut doluluğa göre tahmini yanlış pozitif oranı"""
+        return self.fill_ratio() ** self.hash_count
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "items": self.items,
+            "bit_count": self.bit_count,
+            "hash_count": self.hash_count,
+            "memory_bytes": self.memory_bytes,
+            "target_false_positive_rate": self.error_rate,
+            "estimated_false_positive_rate": round(self.estimated_false_positive_rate(), 6),
+            "fill_ratio": round(self.fill_ratio(), 4)
+        }
@@ -0,0 +1,115 @@
+"""
+Bellek içi önbellek yardımcıları
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from utils.metrics import record_cache_lookup
+
+
+# get() için "kayıt yok" işareti (None da önbelleğe alınabilir bir değerdir)
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe, boyut sınırlı LRU önbellek (opsiyonel TTL)
+
+    `generation` her invalidation'da artar; bir değeri kaynağından okumadan
+    önce alınan generation ile `set()` çağrılırsa, arada gelen bir
+    invalidation eski değerin önbelleğe yazılmasını engeller.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Verilirse isabet/ıskalar Prometheus'a bu adla raporlanır
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Değeri getir; yoksa veya süresi dolduysa default döner"""
+        value = self._get(key, default)
+        if self.name is not None:
+            record_cache_lookup(self.name, value is not default)
+        return value
+
+    def _get(self, key: Hashable, default: Any) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+            generation: Optional[int] = None) -> bool:
+        """Değeri yaz; generation değişmişse yazmaz ve False döner"""
+        if self.maxsize <= 0:
+            return False
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key: Hashable):
+        """Anahtarı önbellekten çıkar"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Önbellek sayaçlarını döndür"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
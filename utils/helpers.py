@@ -1,9 +1,15 @@
 """
 Yardımcı fonksiyonlar
 """
+import unicodedata
 from typing import Dict, Any, Optional
 
 
+# Noktalı/noktasız i ayrımı OCR ve klavye girişinde güvenilir değil;
+# eşleştirmede hepsi "i" kabul edilir. Dönüşüm karakter sayısını korur.
+_TURKISH_I_MAP = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+
+
 def format_product_response(product: Dict[str, Any]) -> Dict[str, Any]:
     """Ürün yanıtını format et"""
     return {
@@ -17,7 +23,8 @@ def format_product_response(product: Dict[str, Any]) -> Dict[str, Any]:
         "certified_gluten_free": bool(product["certified_gluten_free"]),
         "ingredients_text": product.get("ingredients_text"),
         "source": product.get("source"),
-        "added_date": product["added_date"]
+        "added_date": product["added_date"],
+        "ruleset_version": product.get("ruleset_version")
     }
 
 
@@ -45,3 +52,14 @@ def calculate_confidence_percentage(confidence: float) -> str:
     """Güven oranını yüzde olarak format et"""
     percentage = round(confidence * 100, 1)
     return f"%{percentage}"
+
+
+def turkish_casefold(text: str) -> str:
+    """Türkçe duyarlı küçük harfe çevir (İ/I/ı -> i), uzunluğu korur"""
+    return text.translate(_TURKISH_I_MAP).lower()
+
+
+def fold_turkish(text: str) -> str:
+    """Küçük harf + aksan temizliği (ğ->g, ş->s, ç->c, ö->o, ü->u)"""
+    decomposed = unicodedata.normalize("NFKD", turkish_casefold(text))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
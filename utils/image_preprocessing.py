@@ -0,0 +1,80 @@
+"""
+OCR öncesi görüntü ön işleme - ölçekleme, gri ton, EXIF yönü, kontrast
+"""
+import io
+from typing import Any, Dict, Optional
+
+
+# Her preset sırayla uygulanan adımları tanımlar:
+#   draft          - JPEG'i DCT ölçeklemesiyle doğrudan küçük çöz (tam çözünürlük hiç açılmaz)
+#   max_side       - uzun kenar bu değeri aşıyorsa küçült (0 = küçültme)
+#   grayscale      - tek kanala indir (EasyOCR zaten gri tonla tanır)
+#   exif_transpose - telefonun EXIF yön bilgisine göre döndür
+#   autocontrast   - histogramı gerer, soluk baskılarda tanımayı iyileştirir
+PRESETS: Dict[str, Dict[str, Any]] = {
+    "none": {
+        "draft": False, "max_side": 0, "grayscale": False,
+        "exif_transpose": False, "autocontrast": False
+    },
+    "fast": {
+        "draft": True, "max_side": 1280, "grayscale": True,
+        "exif_transpose": True, "autocontrast": False
+    },
+    "balanced": {
+        "draft": True, "max_side": 1600, "grayscale": True,
+        "exif_transpose": True, "autocontrast": True
+    },
+    "quality": {
+        "draft": False, "max_side": 2560, "grayscale": True,
+        "exif_transpose": True, "autocontrast": True
+    },
+}
+
+
+def resolve_preset(name: str, max_side: Optional[int] = None) -> Dict[str, Any]:
+    """Preset ayarlarını getir; max_side verilirse preset değerini ezer"""
+    if name not in PRESETS:
+        raise ValueError(f"Bilinmeyen ön işleme preset'i: {name} (seçenekler: {', '.join(PRESETS)})")
+    options = dict(PRESETS[name])
+    if max_side:
+        options["max_side"] = max_side
+    return options
+
+
+def preprocess_image(image_bytes: bytes, options: Dict[str, Any]):
+    """
+    Görüntüyü OCR için hazırla
+
+    Args:
+        image_bytes: Yüklenen dosyanın binary verisi
+        options: resolve_preset() çıktısı
+
+    Returns:
+        numpy dizisi (gri tonda HxW, renkli HxWx3) - easyocr.Reader.readtext girdisi
+    """
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    image = Image.open(io.BytesIO(image_bytes))
+    max_side = options["max_side"]
+
+    if options["draft"] and max_side and image.format == "JPEG":
+        width, height = image.size
+        longest = max(width, height)
+        if longest > max_side:
+            # En-boy oranını koruyan hedef; draft en az bu boyutta bir ölçek seçer
+            target = (max(1, width * max_side // longest), max(1, height * max_side // longest))
+            image.draft("L" if options["grayscale"] else "RGB", target)
+
+    if options["exif_transpose"]:
+        image = ImageOps.exif_transpose(image)
+
+    image = image.convert("L" if options["grayscale"] else "RGB")
+
+    if max_side and max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    if options["autocontrast"]:
+        image = ImageOps.autocontrast(image, cutoff=1)
+
+    return np.asarray(image)
@@ -0,0 +1,136 @@
+"""
+Prometheus metrikleri (pip install prometheus-client)
+
+Birden fazla worker süreci (gunicorn/uvicorn --workers) için `PROMETHEUS_MULTIPROC_DIR` ortam değişkeni süreçler başlamadan önce
+boş bir dizine ayarlanmalıdır; `/metrics` bu durumda tüm süreçlerin
+değerlerini birleştirir. Kütüphane kurulu değilse metrikler sessizce
+yok sayılır.
+"""
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Tuple
+
+from utils.timing import record_span
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+    HAS_PROMETHEUS = True
+except ImportError:
+    HAS_PROMETHEUS = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _NoopMetric:
+    """prometheus-client yokken metrik çağrılarını yutar"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+
+# Saniye cinsinden kovalar: ms'lik DB sorgularından saniyelerce süren OCR'a kadar
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+if HAS_PROMETHEUS:
+    REQUEST_SECONDS = Histogram(
+        "http_request_duration_seconds", "HTTP istek süresi",
+        ["route", "method", "status"], buckets=_LATENCY_BUCKETS
+    )
+    STAGE_SECONDS = Histogram(
+        "analysis_stage_duration_seconds", "Analiz aşaması süresi (OCR, çıkarma, NLP)",
+        ["stage"], buckets=_LATENCY_BUCKETS
+    )
+    DB_QUERY_SECONDS = Histogram(
+        "db_query_duration_seconds", "Database metodu süresi",
+        ["method"], buckets=_LATENCY_BUCKETS
+    )
+    CACHE_REQUESTS = Counter(
+        "cache_requests_total", "Önbellek sorguları", ["cache", "result"]
+    )
+    OCR_IN_FLIGHT = Gauge(
+        "ocr_in_flight", "Çalışan ya da kuyrukta bekleyen OCR işleri",
+        multiprocess_mode="livesum"
+    )
+    OCR_REJECTED = Counter(
+        "ocr_rejected_total", "Kuyruk dolu olduğu için reddedilen OCR işleri"
+    )
+else:
+    REQUEST_SECONDS = STAGE_SECONDS = DB_QUERY_SECONDS = _NoopMetric()
+    CACHE_REQUESTS = OCR_IN_FLIGHT = OCR_REJECTED = _NoopMetric()
+
+
+@contextmanager
+def observe_stage(stage: str):
+    """Bloğun süresini analiz aşaması histogramına ve istek zamanlamasına yaz"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        record_span(stage, elapsed * 1000)
+
+
+def record_stage(stage: str, duration_ms: float, count: int = 1):
+    """Başka bir süreçte ölçülmüş aşama süresini histograma ve istek zamanlamasına yaz"""
+    STAGE_SECONDS.labels(stage=stage).observe(duration_ms / 1000)
+    record_span(stage, duration_ms, count)
+
+
+def track_db_query(func: Callable) -> Callable:
+    """Database metodunun süresini metot adıyla ölç (istek zamanlamasında `db`)"""
+    histogram = DB_QUERY_SECONDS.labels(method=func.__name__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            histogram.observe(elapsed)
+            record_span("db", elapsed * 1000)
+
+    return wrapper
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """/metrics yanıt gövdesi ve content type"""
+    if not HAS_PROMETHEUS:
+        return b"# prometheus-client kurulu degil\n", CONTENT_TYPE_LATEST
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    from prometheus_client import REGISTRY
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """gunicorn `child_exit` hook'u: ölen worker'ın canlı gauge'larını temizle"""
+    if HAS_PROMETHEUS and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
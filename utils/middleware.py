@@ -0,0 +1,166 @@
+"""
+ASGI middleware'leri
+"""
+import time
+from typing import Iterable
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import REQUEST_SECONDS
+from utils.timing import collect_spans
+
+
+# multipart sınırları ve part başlıkları için dosya boyutuna eklenen pay
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """İstek gövdesini akış halinde sayar, sınırı aşanı okuma sırasında keser
+
+    `Content-Length` sınırı aşıyorsa istek hiç okunmadan 413 döner.
+    Uzunluk bildirilmemişse (chunked) gövde parça parça sayılır; sınır
+    aşıldığı anda uygulamaya bağlantı kopmuş gibi bildirilir ve uygulamanın
+    üreteceği yanıt yerine 413 gönderilir. Böylece büyük bir yükleme
+    belleğe ya da diske tamamen yazılmadan reddedilir.
+    """
+
+    def __init__(self, app: ASGIApp, max_upload_size: int, path_prefixes: Iterable[str] = ("/",)):
+        self.app = app
+        self.max_upload_size = max_upload_size
+        self.max_body_size = max_upload_size + MULTIPART_OVERHEAD
+        self.path_prefixes = tuple(path_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT", "PATCH")
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        response_started = False
+
+        async def guarded_send(message: Message):
+            nonlocal response_started
+            if exceeded:
+                # Uygulamanın yarım gövdeye verdiği yanıt yerine 413 gönder
+                if not response_started:
+                    response_started = True
+                    await self._reject(scope, receive, send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+            if not response_started:
+                await self._reject(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send):
+        limit_mb = self.max_upload_size / (1024 * 1024)
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"Dosya {limit_mb:.3g}MB'dan küçük olmalıdır"},
+            headers={"Connection": "close"}
+        )
+        await response(scope, receive, send)
+
+
+class MetricsMiddleware:
+    """İstek süresini route adı (endpoint fonksiyonu) ile histograma yazar
+
+    Etiket olarak URL yerine eşleşen route'un adı kullanılır
+    (`scan_barcode`, `analyze_ingredients` ...); böylece barkod gibi yol
+    parametreleri metrik kardinalitesini şişirmez.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Router eşleşen route'u scope'a yazar
+            route = scope.get("route")
+            REQUEST_SECONDS.labels(
+                route=getattr(route, "name", None) or "unmatched",
+                method=scope["method"],
+                status=str(status_code)
+            ).observe(time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """İsteğin aşama sürelerini `Server-Timing` yanıt başlığına yazar
+
+    Her istek için yeni bir zamanlama toplayıcısı başlatılır; uygulama
+    içindeki `span`/`observe_stage` blokları ve `Database` çağrıları buna
+    yazar. Gövdenin son parçası geldiğinde `upload`, yanıt başlıkları
+    gönderilirken de `total` eklenir.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        with collect_spans() as collector:
+            async def timed_receive() -> Message:
+                message = await receive()
+                if message["type"] == "http.request" and not message.get("more_body", False):
+                    collector.record("upload", (time.perf_counter() - started) * 1000)
+                return message
+
+            async def send_wrapper(message: Message):
+                if message["type"] == "http.response.start":
+                    collector.record("total", (time.perf_counter() - started) * 1000)
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", collector.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, timed_receive, send_wrapper)
@@ -0,0 +1,79 @@
+"""
+İstek bazlı zamanlama - adlandırılmış aşama süreleri ve Server-Timing başlığı
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+class SpanCollector:
+    """Bir isteğin aşama sürelerini toplar; aynı adlı aşamalar toplanır"""
+
+    def __init__(self):
+        self.spans: Dict[str, list] = {}  # ad -> [toplam ms, adet]
+
+    def record(self, name: str, duration_ms: float, count: int = 1):
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [duration_ms, count]
+        else:
+            span[0] += duration_ms
+            span[1] += count
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: round(total, 2) for name, (total, _) in self.spans.items()}
+
+    def server_timing(self) -> str:
+        """RFC Server-Timing başlık değeri: `ad;dur=12.3;desc="3x"`"""
+        entries = []
+        for name, (total, count) in self.spans.items():
+            entry = f"{name};dur={total:.2f}"
+            if count > 1:
+                entry += f';desc="{count}x"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+# Thread havuzuna (run_in_threadpool, AsyncDatabase) bağlamla birlikte taşınır;
+# ayrı süreçlerde (OCR havuzu) boştur
+_collector: ContextVar[Optional[SpanCollector]] = ContextVar("timing_collector", default=None)
+
+
+@contextmanager
+def collect_spans():
+    """Yeni bir toplayıcı başlat (istek başında ya da bir worker sürecinde)"""
+    collector = SpanCollector()
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(token)
+
+
+def current_spans() -> Dict[str, float]:
+    """Geçerli isteğin şimdiye kadarki aşama süreleri (ms)"""
+    collector = _collector.get()
+    return collector.as_dict() if collector is not None else {}
+
+
+def record_span(name: str, duration_ms: float, count: int = 1):
+    """Başka yerde ölçülmüş süreyi geçerli isteğe ekle"""
+    collector = _collector.get()
+    if collector is not None:
+        collector.record(name, duration_ms, count)
+
+
+@contextmanager
+def span(name: str):
+    """Bloğun süresini geçerli isteğe adlandırılmış aşama olarak yaz"""
+    collector = _collector.get()
+    if collector is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        collector.record(name, (time.perf_counter() - started) * 1000)
@@ -2,7 +2,7 @@
 Input validasyon fonksiyonları
 """
 import re
-from typing import Tuple
+from typing import Optional, Tuple
 
 
 def validate_barcode(barcode: str) -> Tuple[bool, str]:
@@ -50,3 +50,26 @@ def validate_email(email: str) -> Tuple[bool, str]:
         return True, "Geçerli"
     else:
         return False, "Geçersiz email adresi"
+
+
+# Desteklenen görüntülerin dosya imzaları (magic bytes)
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "image/jpeg",
+    b"\x89PNG\r\n\x1a\n": "image/png",
+}
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """Dosyanın ilk baytlarından görüntü türünü belirle (content_type'a güvenmeden)"""
+    for signature, media_type in IMAGE_SIGNATURES.items():
+        if header.startswith(signature):
+            return media_type
+    return None
+
+
+def validate_image_header(header: bytes) -> Tuple[bool, str]:
+    """Yüklenen dosya gerçekten JPG veya PNG mi?"""
+    if sniff_image_type(header) is None:
+        return False, "Yalnızca JPG ve PNG dosyaları desteklenir"
+    
+    return True, "Geçerli"